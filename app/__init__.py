@@ -1,6 +1,16 @@
 from flask import Flask
 from pathlib import Path
-import os
+import uuid
+
+from .config import AppConfig
+
+
+def _ensure_media_dirs(media_dir: str, ingest_dir: str) -> None:
+    """Create the media directories: one exist_ok mkdir each, so deleted dirs come back."""
+    # parents=True also creates the data directory itself
+    Path(media_dir).mkdir(parents=True, exist_ok=True)
+    Path(ingest_dir).mkdir(exist_ok=True)
+
 
 def create_app(test_config: dict | None = None) -> Flask:
     """
@@ -10,29 +20,14 @@ def create_app(test_config: dict | None = None) -> Flask:
     """
     app = Flask(__name__, instance_relative_config=False)
 
-    repo_root = Path(__file__).resolve().parents[1]
-    
-    # Support environment variable for database path (for Termux and other environments)
-    db_path_env = os.environ.get("APP_DB_PATH")
-    if db_path_env:
-        db_path = Path(db_path_env)
-        # Convert relative paths to absolute based on repo root
-        if not db_path.is_absolute():
-            db_path = repo_root / db_path
-    else:
-        # Default path
-        db_path = repo_root / "data" / "family_tree.sqlite"
-    
-    # Ensure parent directory exists
-    data_dir = db_path.parent
-    data_dir.mkdir(parents=True, exist_ok=True)
-    (data_dir / "media").mkdir(exist_ok=True)
-    (data_dir / "media_ingest").mkdir(exist_ok=True)
+    settings = AppConfig.from_env()
+    _ensure_media_dirs(settings.media_dir, settings.media_ingest_dir)
 
     app.config.from_mapping(
-        DATABASE=str(db_path),
-        MEDIA_DIR=str(data_dir / "media"),
-        MEDIA_INGEST_DIR=str(data_dir / "media_ingest"),
+        APP_CONFIG=settings,
+        DATABASE=settings.db_path,
+        MEDIA_DIR=settings.media_dir,
+        MEDIA_INGEST_DIR=settings.media_ingest_dir,
         MAX_CONTENT_LENGTH=25 * 1024 * 1024,
         JSON_SORT_KEYS=False,
         TESTING=False,
@@ -40,6 +35,9 @@ def create_app(test_config: dict | None = None) -> Flask:
 
     if test_config:
         app.config.update(test_config)
+        if test_config.get("TESTING") and "DATABASE" not in test_config:
+            # Tests that don't pick a database get a private in-memory one: no file, no fsync, no cleanup
+            app.config["DATABASE"] = f"file:memdb_{uuid.uuid4().hex}?mode=memory&cache=shared"
 
     from . import db
     db.init_app(app)
@@ -51,17 +49,19 @@ def create_app(test_config: dict | None = None) -> Flask:
     # Ensure tables exist for tests and first-run scenarios
     with app.app_context():
         from .db import (
+            create_schema,
             get_engine,
             ensure_media_links_asset_id,
+            ensure_media_assets_sha256_unique,
             ensure_media_assets_status,
             ensure_media_derivations_table,
             ensure_data_quality_tables,
             ensure_person_attributes_table,
         )
-        from .models import Base
         engine = get_engine()
-        Base.metadata.create_all(engine)
+        create_schema(engine)
         ensure_media_links_asset_id(engine)
+        ensure_media_assets_sha256_unique(engine)
         ensure_media_assets_status(engine)
         ensure_media_derivations_table(engine)
         ensure_data_quality_tables(engine)
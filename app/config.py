@@ -0,0 +1,71 @@
+"""
+Environment-driven settings (for Termux and other environments).
+
+APP_DB_PATH, APP_BIND_HOST, APP_PORT and APP_DEBUG are read into one frozen
+AppConfig; create_app and run.py use it instead of reading os.environ themselves.
+A malformed APP_PORT falls back to the default (with a warning) rather than
+stopping the app factory, which never uses the port.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PORT = 3001
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    db_path: str
+    bind_host: str
+    port: int
+    debug: bool
+    media_dir: str
+    media_ingest_dir: str
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "AppConfig":
+        """Build the config from environment variables (os.environ by default)."""
+        env = os.environ if environ is None else environ
+        return _build(
+            env.get("APP_DB_PATH"),
+            env.get("APP_BIND_HOST", "127.0.0.1"),
+            env.get("APP_PORT", str(DEFAULT_PORT)),
+            env.get("APP_DEBUG", "0"),
+        )
+
+
+@lru_cache(maxsize=None)
+def _build(db_path_env: Optional[str], bind_host: str, port: str, debug: str) -> AppConfig:
+    # Instances are immutable, so one per distinct set of env values is shared
+    if db_path_env:
+        db_path = Path(db_path_env)
+        # Convert relative paths to absolute based on repo root
+        if not db_path.is_absolute():
+            db_path = REPO_ROOT / db_path
+    else:
+        # Default path
+        db_path = REPO_ROOT / "data" / "family_tree.sqlite"
+
+    try:
+        port_number = int(port)
+    except ValueError:
+        logger.warning("APP_PORT must be a port number, got %r; using %d", port, DEFAULT_PORT)
+        port_number = DEFAULT_PORT
+
+    data_dir = db_path.parent
+    return AppConfig(
+        db_path=str(db_path),
+        bind_host=bind_host,
+        port=port_number,
+        debug=debug == "1",
+        media_dir=str(data_dir / "media"),
+        media_ingest_dir=str(data_dir / "media_ingest"),
+    )
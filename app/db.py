@@ -1,30 +1,122 @@
+import logging
+
 from flask import g
-from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+
+logger = logging.getLogger(__name__)
 
 # Global engine and session factory
 _engine = None
 _SessionLocal = None
-
-def init_engine(database_url: str) -> None:
+_ScopedSession = None
+
+# WAL lets readers run alongside the writer and needs one fsync per commit
+# (at checkpoints) instead of two; synchronous=NORMAL is safe under WAL.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+)
+
+# Test databases are throwaway: skip fsyncs and keep journal/temp b-trees in RAM
+TEST_SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=OFF",
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+)
+
+def _apply_sqlite_pragmas(engine, pragmas) -> None:
+    """Run the given PRAGMA statements on every new DBAPI connection."""
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+def is_memory_database(database: str) -> bool:
+    """True for ":memory:" and for SQLite URI filenames such as "file:name?mode=memory"."""
+    return ":memory:" in database or "mode=memory" in database
+
+def init_engine(database_url: str, testing: bool = False) -> None:
     """Initialize the SQLAlchemy engine and session factory."""
-    global _engine, _SessionLocal
+    global _engine, _SessionLocal, _ScopedSession
+    engine_kwargs = {}
+    if database_url.startswith("sqlite") and is_memory_database(database_url):
+        # An in-memory database lives only as long as its connection, so keep exactly one
+        # (which also means the connect-time PRAGMAs run once per test app)
+        engine_kwargs["poolclass"] = StaticPool
     _engine = create_engine(
         database_url,
         echo=False,
-        connect_args={"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        connect_args={"check_same_thread": False} if database_url.startswith("sqlite") else {},
+        **engine_kwargs,
     )
+    if database_url.startswith("sqlite"):
+        _apply_sqlite_pragmas(_engine, TEST_SQLITE_PRAGMAS if testing else SQLITE_PRAGMAS)
     _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+    _ScopedSession = scoped_session(_SessionLocal)
 
     # Non-breaking startup migrations / legacy compatibility
     ensure_places_authority_columns(_engine)
     ensure_place_normalization_rules(_engine)
     ensure_media_links_asset_id(_engine)
+    ensure_media_assets_sha256_unique(_engine)
     ensure_media_assets_status(_engine)
     ensure_media_derivations_table(_engine)
     ensure_data_quality_tables(_engine)
     ensure_person_attributes_table(_engine)
 
+_schema_scripts = None
+
+def _schema_ddl(engine) -> dict:
+    """
+    Compile each ORM table into a CREATE TABLE + CREATE INDEX script, keyed by
+    table name (cached; the models never change at runtime).
+    """
+    global _schema_scripts
+    if _schema_scripts is None:
+        from sqlalchemy.schema import CreateIndex, CreateTable
+        from .models import Base
+
+        scripts = {}
+        for table in Base.metadata.sorted_tables:
+            statements = [str(CreateTable(table, if_not_exists=True).compile(dialect=engine.dialect)).strip()]
+            for index in sorted(table.indexes, key=lambda idx: idx.name):
+                statements.append(str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect)).strip())
+            scripts[table.name] = ";\n".join(statements) + ";\n"
+        _schema_scripts = scripts
+    return _schema_scripts
+
+def create_schema(engine) -> None:
+    """
+    Create missing ORM tables with their indexes. Like create_all, tables that
+    already exist are left alone (indexes added later belong in an ensure_*
+    helper). On SQLite the missing tables go through a single executescript call
+    instead of one inspect + CREATE round-trip per table.
+    """
+    if engine.dialect.name != "sqlite":
+        from .models import Base
+        Base.metadata.create_all(engine)
+        return
+    scripts = _schema_ddl(engine)
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        missing = "".join(script for name, script in scripts.items() if name not in existing)
+        if missing:
+            conn.executescript(missing)
+    finally:
+        raw.close()
+
 def get_engine():
     """Get the SQLAlchemy engine."""
     return _engine
@@ -35,6 +127,21 @@ def get_session() -> Session:
         g.db_session = _SessionLocal()
     return g.db_session
 
+def get_scoped_session() -> scoped_session:
+    """Get the thread-local session registry for code running outside a request (scripts, tests)."""
+    return _ScopedSession
+
+def bind_session(bind=None) -> None:
+    """
+    Point request sessions at an external connection (used by tests to wrap
+    each test in one transaction). Session commits become SAVEPOINT releases
+    so the caller can roll everything back. Pass None to restore the engine.
+    """
+    if bind is None:
+        _SessionLocal.configure(bind=_engine, join_transaction_mode="conservative_savepoint")
+    else:
+        _SessionLocal.configure(bind=bind, join_transaction_mode="create_savepoint")
+
 def close_session(e=None) -> None:
     """Close the SQLAlchemy session at the end of the request."""
     session = g.pop("db_session", None)
@@ -45,11 +152,16 @@ def init_app(app) -> None:
     """Initialize database with Flask app."""
     from pathlib import Path
     
-    # Initialize engine
+    # Initialize engine (DATABASE may be ":memory:" or a "file:...?mode=memory" URI for tests)
     db_path = app.config["DATABASE"]
-    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    database_url = f"sqlite:///{db_path}"
-    init_engine(database_url)
+    if is_memory_database(db_path):
+        database_url = f"sqlite:///{db_path}"
+        if db_path.startswith("file:"):
+            database_url += "&uri=true" if "?" in db_path else "?uri=true"
+    else:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        database_url = f"sqlite:///{db_path}"
+    init_engine(database_url, testing=app.config.get("TESTING", False))
 
     # Non-breaking migration: add optional place authority fields
     ensure_places_authority_columns(get_engine())
@@ -132,30 +244,6 @@ def ensure_media_links_asset_id(engine) -> None:
         conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_links_person ON media_links(person_id)"))
         conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_links_family ON media_links(family_id)"))
 
-def ensure_media_derivations_table(engine) -> None:
-    """Create media_derivations table if missing (idempotent)."""
-    inspector = inspect(engine)
-    if "media_derivations" in inspector.get_table_names():
-        return
-    with engine.begin() as conn:
-        conn.execute(text(
-            """
-            CREATE TABLE media_derivations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                original_asset_id INTEGER NOT NULL,
-                derived_asset_id INTEGER NOT NULL,
-                derivation_type TEXT NOT NULL,
-                created_at DATETIME NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY(original_asset_id) REFERENCES media_assets(id) ON DELETE CASCADE,
-                FOREIGN KEY(derived_asset_id) REFERENCES media_assets(id) ON DELETE CASCADE
-            )
-            """
-        ))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_derivations_original ON media_derivations(original_asset_id)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_derivations_derived ON media_derivations(derived_asset_id)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_derivations_type ON media_derivations(derivation_type)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_links_asset ON media_links(asset_id)"))
-
     columns = {col["name"] for col in inspector.get_columns("media_links")}
     if "asset_id" in columns:
         with engine.begin() as conn:
@@ -187,6 +275,62 @@ def ensure_media_derivations_table(engine) -> None:
                 conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_links_asset ON media_links(asset_id)"))
 
 
+def ensure_media_derivations_table(engine) -> None:
+    """Create media_derivations table if missing (idempotent)."""
+    inspector = inspect(engine)
+    if "media_derivations" in inspector.get_table_names():
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            CREATE TABLE media_derivations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                original_asset_id INTEGER NOT NULL,
+                derived_asset_id INTEGER NOT NULL,
+                derivation_type TEXT NOT NULL,
+                created_at DATETIME NOT NULL DEFAULT (datetime('now')),
+                FOREIGN KEY(original_asset_id) REFERENCES media_assets(id) ON DELETE CASCADE,
+                FOREIGN KEY(derived_asset_id) REFERENCES media_assets(id) ON DELETE CASCADE
+            )
+            """
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_derivations_original ON media_derivations(original_asset_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_derivations_derived ON media_derivations(derived_asset_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_media_derivations_type ON media_derivations(derivation_type)"))
+
+
+def ensure_media_assets_sha256_unique(engine) -> None:
+    """
+    Make media_assets.sha256 unique on legacy tables (upload dedup relies on it).
+    Never deletes rows: if duplicate hashes exist the index is skipped with a
+    warning, and `alembic upgrade head` merges them.
+    """
+    inspector = inspect(engine)
+    if "media_assets" not in inspector.get_table_names():
+        return
+    if any(ix["unique"] and ix["column_names"] == ["sha256"] for ix in inspector.get_indexes("media_assets")):
+        return
+    if any(uc["column_names"] == ["sha256"] for uc in inspector.get_unique_constraints("media_assets")):
+        return
+
+    with engine.begin() as conn:
+        dupes = conn.execute(
+            text(
+                "SELECT sha256, GROUP_CONCAT(id) FROM media_assets "
+                "WHERE sha256 IS NOT NULL GROUP BY sha256 HAVING COUNT(*) > 1"
+            )
+        ).fetchall()
+        if dupes:
+            for sha256, ids in dupes:
+                logger.warning("media_assets ids %s share sha256=%s", ids, sha256)
+            logger.warning(
+                "Not adding the unique sha256 index; run `alembic upgrade head` to merge the duplicates"
+            )
+            return
+        conn.execute(text("DROP INDEX IF EXISTS ix_media_assets_sha256"))
+        conn.execute(text("CREATE UNIQUE INDEX ix_media_assets_sha256 ON media_assets(sha256)"))
+
+
 def ensure_media_assets_status(engine) -> None:
     """Add status/source_path columns for legacy media_assets tables and backfill values."""
     inspector = inspect(engine)
@@ -8,7 +8,7 @@ is stored as a DataQualityIssue row with an explanation payload that can be
 shown to users in the Data Quality dashboard.
 """
 
-from datetime import datetime
+from datetime import date, datetime
 import json
 import math
 import re
@@ -40,6 +40,16 @@ YEAR_RE = re.compile(r"(1[5-9]\d{2}|20\d{2})")
 DATE_RANGE_RE = re.compile(r"\bBET\s+(?P<start>\d{3,4})\s+AND\s+(?P<end>\d{3,4})", re.IGNORECASE)
 QUALIFIER_RE = re.compile(r"\b(ABT|ABOUT|BEF|AFT|EST|CALC|CIRCA|CA\.?)\b", re.IGNORECASE)
 AMBIGUOUS_NUMERIC_RE = re.compile(r"^(?P<first>\d{1,2})[/-](?P<second>\d{1,2})[/-](?P<year>\d{3,4})$")
+# Exact dates: yyyy-mm-dd / yyyy/mm/dd, or dd/mm/yyyy and mm/dd/yyyy (told apart by validation)
+EXACT_DATE_RE = re.compile(
+    r"(?P<year>\d{4})(?P<sep>[-/])(?P<month>\d{1,2})(?P=sep)(?P<day>\d{1,2})"
+    r"|(?P<first>\d{1,2})/(?P<second>\d{1,2})/(?P<slash_year>\d{4})"
+)
+MONTH_YEAR_RE = re.compile(r"(?P<month>[A-Za-z]{3,9}|\d{1,2})[ ,/]+(?P<year>\d{3,4})", re.IGNORECASE)
+MONTHS = {
+    "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AUG": 8, "SEP": 9, "SEPT": 9, "OCT": 10, "NOV": 11, "DEC": 12,
+}
 PLACE_CLEAN_CONFIDENCE = 0.65  # confidence threshold for automated place normalization; keeps automated cleaning conservative and reviewable
 
 
@@ -113,10 +123,31 @@ def _norm_place(value: str | None) -> str:
     return " ".join(v.split())
 
 
-def _name_similarity(a: str, b: str) -> float:
+def _name_similarity(
+    a: str,
+    b: str,
+    matchers: dict[str, SequenceMatcher] | None = None,
+    cutoff: float = 0.0,
+) -> float:
+    """
+    SequenceMatcher(None, a, b).ratio(). Detectors that compare the same strings
+    many times pass a per-scan `matchers` dict so the index SequenceMatcher builds
+    for `b` (its b2j table, the expensive part) is built once per distinct string.
+    Pairs that cannot reach `cutoff` return 0.0 without running the full match.
+    """
     if not a or not b:
         return 0.0
-    return SequenceMatcher(None, a, b).ratio()
+    if matchers is None:
+        matcher = SequenceMatcher(None, a, b)
+    else:
+        matcher = matchers.get(b)
+        if matcher is None:
+            matcher = matchers[b] = SequenceMatcher(None, b=b)
+        matcher.set_seq1(a)
+    # Cheap upper bounds first: length-only, then character multiset overlap
+    if cutoff and (matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff):
+        return 0.0
+    return matcher.ratio()
 
 
 def _norm_filename(value: str | None) -> str:
@@ -151,6 +182,18 @@ def _parse_date(value: str | None) -> Tuple[str | None, str | None, str | None,
     if not raw:
         return None, None, None, 0.0, False
 
+    # Fast paths for the most common shapes, "YYYY" and "YYYY-MM-DD", without the regexes
+    if raw.isascii():
+        if len(raw) == 4 and raw.isdigit():
+            if "1500" <= raw <= "2099":
+                return raw, "year", None, 0.7, False
+            return None, None, None, 0.0, True
+        if len(raw) == 10 and raw[4] == raw[7] == "-" and (raw[:4] + raw[5:7] + raw[8:]).isdigit():
+            try:
+                return date(int(raw[:4]), int(raw[5:7]), int(raw[8:])).isoformat(), "day", None, 0.95, False
+            except ValueError:
+                pass
+
     amb_match = AMBIGUOUS_NUMERIC_RE.match(raw)
     if amb_match:
         first = int(amb_match.group("first"))
@@ -170,34 +213,33 @@ def _parse_date(value: str | None) -> Tuple[str | None, str | None, str | None,
     if qual_m:
         qualifier = qual_m.group(1).lower()
 
-    # Exact date formats
-    # Attempt both day-first and month-first; no heuristic disambiguation beyond trying both.
-    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d"):
-        try:
-            dt = datetime.strptime(raw, fmt)
-            return dt.strftime("%Y-%m-%d"), "day", qualifier, 0.95, False
-        except Exception:
-            continue
+    # Exact date formats: one match, then validate. Slash dates try day-first, then
+    # month-first; no heuristic disambiguation beyond trying both.
+    exact = EXACT_DATE_RE.fullmatch(raw)
+    if exact:
+        if exact.group("year"):
+            candidates = [(exact.group("year"), exact.group("month"), exact.group("day"))]
+        else:
+            first, second, year = exact.group("first", "second", "slash_year")
+            candidates = [(year, second, first), (year, first, second)]
+        for year, month, day in candidates:
+            try:
+                dt = date(int(year), int(month), int(day))
+            except ValueError:
+                continue
+            return dt.isoformat(), "day", qualifier, 0.95, False
 
     # Month year e.g. Mar 1881 / 03 1881
-    month_year = re.match(r"(?P<month>[A-Za-z]{3,9}|\d{1,2})[ ,/]+(?P<year>\d{3,4})", raw, re.IGNORECASE)
+    month_year = MONTH_YEAR_RE.match(raw)
     if month_year:
         month = month_year.group("month")
         year = month_year.group("year")
-        try:
-            month_map = {
-                "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
-                "JUL": 7, "AUG": 8, "SEP": 9, "SEPT": 9, "OCT": 10, "NOV": 11, "DEC": 12,
-            }
-            if month.isdigit():
-                month_num = int(month)
-            else:
-                month_num = month_map.get(month.upper()[:4]) or month_map.get(month.upper()[:3])
-            if not month_num:
-                month_num = datetime.strptime(month[:3].title(), "%b").month
+        if month.isdigit():
+            month_num = int(month)
+        else:
+            month_num = MONTHS.get(month.upper()[:4]) or MONTHS.get(month.upper()[:3])
+        if month_num:
             return f"{int(year):04d}-{month_num:02d}", "month", qualifier, 0.85, False
-        except Exception:
-            pass
 
     # Year-only
     y = _parse_year(raw)
@@ -290,6 +332,7 @@ def _detect_duplicates(session: Session) -> int:
         buckets[key].append(p)
 
     count = 0
+    matchers: dict[str, SequenceMatcher] = {}
     for group in buckets.values():
         if len(group) < 2:
             continue
@@ -299,7 +342,7 @@ def _detect_duplicates(session: Session) -> int:
                 b = group[j]
                 name_a = f"{_norm_name(a.given)} {_norm_name(a.surname)}"
                 name_b = f"{_norm_name(b.given)} {_norm_name(b.surname)}"
-                sim = _name_similarity(name_a, name_b)
+                sim = _name_similarity(name_a, name_b, matchers, cutoff=0.68)
                 if sim < 0.68:
                     continue
 
@@ -435,37 +478,52 @@ def _detect_places(session: Session) -> int:
             return a if len(a["value"]) > len(b["value"]) else b
         return a if a["value"].lower() <= b["value"].lower() else b
 
-    for i in range(len(raw_entries)):
-        for j in range(i + 1, len(raw_entries)):
+    # Block on length: ratio() is at most 2*min(len)/(len_a+len_b), so walking the
+    # entries shortest-first we can stop as soon as the length gap alone rules out 0.8.
+    by_length = sorted(
+        (k for k, entry in enumerate(raw_entries) if entry["norm"]),
+        key=lambda k: len(raw_entries[k]["norm"]),
+    )
+    matches = []
+    matchers: dict[str, SequenceMatcher] = {}
+    for pos, k in enumerate(by_length):
+        len_k = len(raw_entries[k]["norm"])
+        for m in by_length[pos + 1:]:
+            len_m = len(raw_entries[m]["norm"])
+            if 2 * len_k / (len_k + len_m) < 0.8:
+                break
+            i, j = min(k, m), max(k, m)
             a = raw_entries[i]
             b = raw_entries[j]
-            if not a["norm"] or not b["norm"]:
-                continue
             if a["norm"] == b["norm"]:
                 continue
-            sim = _name_similarity(a["norm"], b["norm"])
-            if sim < 0.8:
-                continue
-            canonical = pick_canonical(a, b)
-            variants_list = sorted(
-                [{"value": a["value"], "count": a["count"]}, {"value": b["value"], "count": b["count"]}],
-                key=lambda item: (-item["count"], item["value"].lower()),
-            )
-            _insert_issue(
-                session,
-                "place_similarity",
-                "info",
-                "place",
-                [],
-                confidence=round(sim, 2),
-                impact=float(a["count"] + b["count"]),
-                explanation={
-                    "canonical_suggestion": canonical["value"],
-                    "variants": variants_list,
-                    "similarity": round(sim, 2),
-                },
-            )
-            count += 1
+            sim = _name_similarity(a["norm"], b["norm"], matchers, cutoff=0.8)
+            if sim >= 0.8:
+                matches.append((i, j, sim))
+
+    for i, j, sim in sorted(matches):
+        a = raw_entries[i]
+        b = raw_entries[j]
+        canonical = pick_canonical(a, b)
+        variants_list = sorted(
+            [{"value": a["value"], "count": a["count"]}, {"value": b["value"], "count": b["count"]}],
+            key=lambda item: (-item["count"], item["value"].lower()),
+        )
+        _insert_issue(
+            session,
+            "place_similarity",
+            "info",
+            "place",
+            [],
+            confidence=round(sim, 2),
+            impact=float(a["count"] + b["count"]),
+            explanation={
+                "canonical_suggestion": canonical["value"],
+                "variants": variants_list,
+                "similarity": round(sim, 2),
+            },
+        )
+        count += 1
     return count
 
 
@@ -475,18 +533,33 @@ def _detect_duplicate_families(session: Session) -> int:
         int(pid): f"{_norm_name(given)} {_norm_name(surname)}".strip()
         for pid, given, surname in people
     }
-    families = session.execute(select(Family)).scalars().all()
-    buckets: dict[tuple[int, int], list[Family]] = defaultdict(list)
-    for fam in families:
-        if not fam.husband_person_id or not fam.wife_person_id:
-            continue
-        key = tuple(sorted([fam.husband_person_id, fam.wife_person_id]))
-        buckets[key].append(fam)
+    families = session.execute(
+        select(
+            Family.id,
+            Family.husband_person_id,
+            Family.wife_person_id,
+            Family.marriage_date,
+            Family.marriage_place,
+        )
+        .where(Family.husband_person_id.is_not(None), Family.wife_person_id.is_not(None))
+        .order_by(Family.id)
+    ).all()
+    families_by_id = {fam.id: fam for fam in families}
+
+    # Same spouse pair in either order: let SQLite do the bucketing
+    spouse_lo = func.min(Family.husband_person_id, Family.wife_person_id)
+    spouse_hi = func.max(Family.husband_person_id, Family.wife_person_id)
+    pair_rows = session.execute(
+        select(spouse_lo, spouse_hi, func.group_concat(Family.id))
+        .where(Family.husband_person_id.is_not(None), Family.wife_person_id.is_not(None))
+        .group_by(spouse_lo, spouse_hi)
+        .having(func.count(Family.id) > 1)
+    ).all()
 
     count = 0
-    for spouse_key, group in buckets.items():
-        if len(group) < 2:
-            continue
+    for lo, hi, id_list in pair_rows:
+        spouse_key = (lo, hi)
+        group = [families_by_id[fid] for fid in sorted(int(x) for x in id_list.split(","))]
         for i in range(len(group)):
             for j in range(i + 1, len(group)):
                 a = group[i]
@@ -514,10 +587,9 @@ def _detect_duplicate_families(session: Session) -> int:
                 )
                 count += 1
 
-    name_buckets: dict[tuple[str, str], list[Family]] = defaultdict(list)
+    # Name matching needs _norm_name's whitespace folding, so this pass stays in Python
+    name_buckets: dict[tuple[str, str], list] = defaultdict(list)
     for fam in families:
-        if not fam.husband_person_id or not fam.wife_person_id:
-            continue
         husband_name = name_map.get(fam.husband_person_id, "").strip()
         wife_name = name_map.get(fam.wife_person_id, "").strip()
         if not husband_name or not wife_name:
@@ -571,35 +643,28 @@ def _detect_duplicate_media_links(session: Session) -> int:
             MediaLink.person_id,
             MediaLink.family_id,
             func.count(MediaLink.id).label("link_count"),
+            func.group_concat(MediaLink.id).label("link_ids"),
         )
         .group_by(MediaLink.asset_id, MediaLink.person_id, MediaLink.family_id)
         .having(func.count(MediaLink.id) > 1)
     ).all()
 
     count = 0
-    for asset_id, person_id, family_id, link_count in rows:
-        link_ids = session.execute(
-            select(MediaLink.id)
-            .where(
-                MediaLink.asset_id == asset_id,
-                MediaLink.person_id == person_id,
-                MediaLink.family_id == family_id,
-            )
-            .order_by(MediaLink.id)
-        ).scalars().all()
+    for asset_id, person_id, family_id, link_count, id_list in rows:
+        link_ids = sorted(int(x) for x in id_list.split(","))
         _insert_issue(
             session,
             "duplicate_media_link",
             "info",
             "media_link",
-            [int(lid) for lid in link_ids],
+            link_ids,
             confidence=0.9,
             impact=float(link_count),
             explanation={
                 "asset_id": asset_id,
                 "person_id": person_id,
                 "family_id": family_id,
-                "link_ids": [int(lid) for lid in link_ids],
+                "link_ids": link_ids,
             },
         )
         count += 1
@@ -626,6 +691,7 @@ def _detect_duplicate_media_assets(session: Session) -> int:
         buckets[prefix].append(entry)
 
     count = 0
+    matchers: dict[str, SequenceMatcher] = {}
     for group in buckets.values():
         if len(group) < 2:
             continue
@@ -633,7 +699,7 @@ def _detect_duplicate_media_assets(session: Session) -> int:
             for j in range(i + 1, len(group)):
                 a = group[i]
                 b = group[j]
-                sim = _name_similarity(a["norm"], b["norm"])
+                sim = _name_similarity(a["norm"], b["norm"], matchers, cutoff=0.92)
                 if sim < 0.92:
                     continue
                 size_a = a["size"]
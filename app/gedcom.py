@@ -1,7 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
-import re
+from typing import Callable, Dict, List, Optional, Tuple
 
 @dataclass
 class Indi:
@@ -25,85 +24,150 @@ class Fam:
     marriage_place: str = ""
     notes: List[str] = field(default_factory=list)
 
-_line_re = re.compile(r"^(?P<lvl>\d+)\s+(?:(?P<xref>@[^@]+@)\s+)?(?P<tag>[A-Z0-9_]+)(?:\s+(?P<val>.*))?$")
+_TAG_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+
+# Tag handlers take (record, value, current_event) and return the new current_event.
+# DATE/PLAC attach to whichever BIRT/DEAT/MARR block was opened last in the record.
+
+def _indi_name(indi: Indi, val: str, event: Optional[str]) -> Optional[str]:
+    if "/" in val:
+        parts = val.split("/")
+        indi.given = parts[0].strip()
+        indi.surname = parts[1].strip()
+    else:
+        indi.given = val.strip()
+    return event
+
+def _indi_givn(indi: Indi, val: str, event: Optional[str]) -> Optional[str]:
+    if val:
+        indi.given = val
+    return event
+
+def _indi_surn(indi: Indi, val: str, event: Optional[str]) -> Optional[str]:
+    if val:
+        indi.surname = val
+    return event
+
+def _indi_sex(indi: Indi, val: str, event: Optional[str]) -> Optional[str]:
+    indi.sex = val
+    return event
+
+def _indi_date(indi: Indi, val: str, event: Optional[str]) -> Optional[str]:
+    if event == "BIRT":
+        indi.birth_date = val
+    elif event == "DEAT":
+        indi.death_date = val
+    return event
+
+def _indi_plac(indi: Indi, val: str, event: Optional[str]) -> Optional[str]:
+    if event == "BIRT":
+        indi.birth_place = val
+    elif event == "DEAT":
+        indi.death_place = val
+    return event
+
+def _fam_husb(fam: Fam, val: str, event: Optional[str]) -> Optional[str]:
+    if val:
+        fam.husb = val
+    return event
+
+def _fam_wife(fam: Fam, val: str, event: Optional[str]) -> Optional[str]:
+    if val:
+        fam.wife = val
+    return event
+
+def _fam_chil(fam: Fam, val: str, event: Optional[str]) -> Optional[str]:
+    if val:
+        fam.chil.append(val)
+    return event
+
+def _fam_date(fam: Fam, val: str, event: Optional[str]) -> Optional[str]:
+    if event == "MARR":
+        fam.marriage_date = val
+    return event
+
+def _fam_plac(fam: Fam, val: str, event: Optional[str]) -> Optional[str]:
+    if event == "MARR":
+        fam.marriage_place = val
+    return event
+
+def _add_note(rec, val: str, event: Optional[str]) -> Optional[str]:
+    if val:
+        rec.notes.append(val)
+    return event
+
+def _open_event(tag: str) -> Callable[[object, str, Optional[str]], Optional[str]]:
+    return lambda rec, val, event: tag
+
+_INDI_HANDLERS: Dict[str, Callable[[Indi, str, Optional[str]], Optional[str]]] = {
+    "NAME": _indi_name,
+    "GIVN": _indi_givn,
+    "SURN": _indi_surn,
+    "SEX": _indi_sex,
+    "BIRT": _open_event("BIRT"),
+    "DEAT": _open_event("DEAT"),
+    "DATE": _indi_date,
+    "PLAC": _indi_plac,
+    "NOTE": _add_note,
+}
+
+_FAM_HANDLERS: Dict[str, Callable[[Fam, str, Optional[str]], Optional[str]]] = {
+    "HUSB": _fam_husb,
+    "WIFE": _fam_wife,
+    "CHIL": _fam_chil,
+    "MARR": _open_event("MARR"),
+    "DATE": _fam_date,
+    "PLAC": _fam_plac,
+    "NOTE": _add_note,
+}
 
 def parse_gedcom(text: str) -> Tuple[Dict[str, Indi], Dict[str, Fam]]:
     indis: Dict[str, Indi] = {}
     fams: Dict[str, Fam] = {}
 
-    lines = [ln.rstrip("\n\r") for ln in text.splitlines() if ln.strip() != ""]
-    current_type = None
-    current_xref = None
+    current = None  # the Indi/Fam record level-1+ lines apply to
+    handlers: Dict[str, Callable] = {}
     current_event = None
 
-    for ln in lines:
-        m = _line_re.match(ln)
-        if not m:
+    # Lines are "LEVEL [@XREF@] TAG [VALUE]"; malformed lines are skipped
+    for ln in text.splitlines():
+        if not ln or ln[0].isspace():
+            continue
+        parts = ln.split(None, 1)
+        if len(parts) < 2 or not parts[0].isdecimal():
             continue
+        lvl, rest = int(parts[0]), parts[1]
 
-        lvl = int(m.group("lvl"))
-        xref = m.group("xref")
-        tag = m.group("tag")
-        val = (m.group("val") or "").strip()
+        xref = None
+        if rest[0] == "@":
+            end = rest.find("@", 1)
+            if end <= 1 or not rest[end + 1:end + 2].isspace():
+                continue
+            xref = rest[:end + 1]
+            rest = rest[end + 1:]
+
+        parts = rest.split(None, 1)
+        if not parts or not _TAG_CHARS.issuperset(parts[0]):
+            continue
+        tag = parts[0]
+        val = parts[1].strip() if len(parts) > 1 else ""
 
         if lvl == 0:
             current_event = None
-            if xref and tag in ("INDI", "FAM"):
-                current_type = tag
-                current_xref = xref
-                if tag == "INDI":
-                    indis.setdefault(xref, Indi(xref=xref))
-                else:
-                    fams.setdefault(xref, Fam(xref=xref))
+            if xref and tag == "INDI":
+                current = indis.setdefault(xref, Indi(xref=xref))
+                handlers = _INDI_HANDLERS
+            elif xref and tag == "FAM":
+                current = fams.setdefault(xref, Fam(xref=xref))
+                handlers = _FAM_HANDLERS
             else:
-                current_type = None
-                current_xref = None
+                current = None
+                handlers = {}
             continue
 
-        if current_type == "INDI" and current_xref in indis:
-            indi = indis[current_xref]
-            if tag == "NAME":
-                if "/" in val:
-                    parts = val.split("/")
-                    indi.given = parts[0].strip()
-                    indi.surname = parts[1].strip()
-                else:
-                    indi.given = val.strip()
-            elif tag == "GIVN" and val:
-                indi.given = val
-            elif tag == "SURN" and val:
-                indi.surname = val
-            elif tag == "SEX":
-                indi.sex = val
-            elif tag in ("BIRT", "DEAT"):
-                current_event = tag
-            elif tag == "DATE" and current_event == "BIRT":
-                indi.birth_date = val
-            elif tag == "PLAC" and current_event == "BIRT":
-                indi.birth_place = val
-            elif tag == "DATE" and current_event == "DEAT":
-                indi.death_date = val
-            elif tag == "PLAC" and current_event == "DEAT":
-                indi.death_place = val
-            elif tag == "NOTE" and val:
-                indi.notes.append(val)
-
-        elif current_type == "FAM" and current_xref in fams:
-            fam = fams[current_xref]
-            if tag == "HUSB" and val:
-                fam.husb = val
-            elif tag == "WIFE" and val:
-                fam.wife = val
-            elif tag == "CHIL" and val:
-                fam.chil.append(val)
-            elif tag == "MARR":
-                current_event = tag
-            elif tag == "DATE" and current_event == "MARR":
-                fam.marriage_date = val
-            elif tag == "PLAC" and current_event == "MARR":
-                fam.marriage_place = val
-            elif tag == "NOTE" and val:
-                fam.notes.append(val)
+        handler = handlers.get(tag)
+        if handler is not None:
+            current_event = handler(current, val, current_event)
 
     for indi in indis.values():
         indi.given = (indi.given or "").strip()
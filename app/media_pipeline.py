@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import csv
-import hashlib
 import json
 import mimetypes
 import os
@@ -9,14 +8,16 @@ import re
 import shutil
 import subprocess
 import time
+from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session, sessionmaker
 
-from .media_utils import create_thumbnail, is_image, safe_filename
+from .media_utils import compute_sha256_file, create_thumbnail, is_image, safe_filename
 from .models import MediaAsset, MediaLink, MediaDerivation, Person
 from .rmtree import (
     collect_media_associations,
@@ -29,21 +30,18 @@ MEDIA_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".tif", ".tiff", ".bmp",
 OCR_IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
 
 
-def compute_sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as fh:
-        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+_BACKSLASH_TO_SLASH = str.maketrans("\\", "/")
 
 
+@lru_cache(maxsize=4096)
 def normalize_path(value: str) -> str:
-    cleaned = (value or "").strip().replace("\\", "/")
-    cleaned = re.sub(r"/+", "/", cleaned)
-    if re.match(r"^[a-zA-Z]:/", cleaned):
+    # Called for every asset/legacy-path comparison, so the same strings come back often
+    cleaned = (value or "").strip().translate(_BACKSLASH_TO_SLASH)
+    if "//" in cleaned:
+        cleaned = re.sub(r"/+", "/", cleaned)
+    if cleaned[1:3] == ":/" and cleaned[0].isascii() and cleaned[0].isalpha():
         cleaned = cleaned[2:]
-    cleaned = cleaned.lstrip("/").lower()
-    return cleaned
+    return cleaned.lstrip("/").lower()
 
 
 def log_event(event: str, payload: Dict[str, Any] | None = None, verbose: bool = False) -> None:
@@ -74,61 +72,99 @@ class MediaIngestService:
         original_name: Optional[str] = None,
         status: str = "unassigned",
     ) -> Tuple[MediaAsset, bool]:
-        file_path = Path(file_path)
-        name = original_name or file_path.name
-        mime = mimetypes.guess_type(name)[0] or "application/octet-stream"
-        sha = compute_sha256_file(file_path)
+        return self.register_assets([file_path], original_name=original_name, status=status)[0]
 
-        existing = self.session.execute(select(MediaAsset).where(MediaAsset.sha256 == sha)).scalar_one_or_none()
-        if existing:
-            updated = False
-            if not existing.source_path:
-                existing.source_path = str(file_path)
-                updated = True
-            if not existing.path:
-                rel_path, _ = self._ensure_asset_file(file_path, name, sha, mime)
-                existing.path = rel_path
-                updated = True
-            if updated and not self.dry_run:
-                self.session.flush()
-            log_event("media.asset.exists", {"sha256": sha, "id": existing.id}, self.verbose)
-            return existing, False
-
-        rel_path, dest = self._ensure_asset_file(file_path, name, sha, mime)
-        thumbnail_path, thumb_w, thumb_h = self._ensure_thumbnail(dest, sha, mime)
-
-        asset = MediaAsset(
-            path=rel_path,
-            sha256=sha,
-            original_filename=name,
-            mime_type=mime,
-            size_bytes=file_path.stat().st_size,
-            thumbnail_path=thumbnail_path,
-            thumb_width=thumb_w,
-            thumb_height=thumb_h,
-            source_path=str(file_path),
-            status=status,
-        )
-        if not self.dry_run:
-            self.session.add(asset)
+    def register_assets(
+        self,
+        file_paths: Iterable[Path],
+        original_name: Optional[str] = None,
+        status: str = "unassigned",
+    ) -> List[Tuple[MediaAsset, bool]]:
+        """
+        Register many files at once: one SELECT for the known hashes and one
+        INSERT OR IGNORE for the new rows, instead of a lookup and flush per file.
+        Returns (asset, created) per input path, in order. The caller commits.
+        """
+        entries = []
+        for file_path in file_paths:
+            file_path = Path(file_path)
+            name = original_name or file_path.name
+            mime = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            entries.append((file_path, name, mime, compute_sha256_file(file_path)))
+        if not entries:
+            return []
+
+        shas = list({sha for _, _, _, sha in entries})
+        existing: Dict[str, MediaAsset] = {}
+        for start in range(0, len(shas), 500):
+            chunk = shas[start:start + 500]
+            for asset in self.session.execute(select(MediaAsset).where(MediaAsset.sha256.in_(chunk))).scalars():
+                existing[asset.sha256] = asset
+
+        new_rows: Dict[str, Dict[str, Any]] = {}
+        for file_path, name, mime, sha in entries:
+            asset = existing.get(sha)
+            if asset is not None:
+                if not asset.source_path:
+                    asset.source_path = str(file_path)
+                if not asset.path:
+                    rel_path, _ = self._ensure_asset_file(file_path, name, sha, mime)
+                    asset.path = rel_path
+                log_event("media.asset.exists", {"sha256": sha, "id": asset.id}, self.verbose)
+                continue
+            if sha in new_rows:
+                continue
+            rel_path, dest = self._ensure_asset_file(file_path, name, sha, mime)
+            thumbnail_path, thumb_w, thumb_h = self._ensure_thumbnail(dest, sha, mime)
+            new_rows[sha] = dict(
+                path=rel_path,
+                sha256=sha,
+                original_filename=name,
+                mime_type=mime,
+                size_bytes=file_path.stat().st_size,
+                thumbnail_path=thumbnail_path,
+                thumb_width=thumb_w,
+                thumb_height=thumb_h,
+                source_path=str(file_path),
+                status=status,
+            )
+            log_event("media.asset.created", {"sha256": sha, "path": rel_path}, self.verbose)
+
+        created: Dict[str, MediaAsset] = {}
+        if self.dry_run:
+            created = {sha: MediaAsset(**row) for sha, row in new_rows.items()}
+        else:
+            # Flush pending updates to existing rows too, matching the old per-file flush
             self.session.flush()
-        log_event("media.asset.created", {"sha256": sha, "path": rel_path}, self.verbose)
-        return asset, True
+            if new_rows:
+                self.session.execute(insert(MediaAsset).prefix_with("OR IGNORE"), list(new_rows.values()))
+                new_shas = list(new_rows)
+                for start in range(0, len(new_shas), 500):
+                    chunk = new_shas[start:start + 500]
+                    for asset in self.session.execute(select(MediaAsset).where(MediaAsset.sha256.in_(chunk))).scalars():
+                        created[asset.sha256] = asset
+
+        results: List[Tuple[MediaAsset, bool]] = []
+        seen_new = set()
+        for _, _, _, sha in entries:
+            if sha in existing:
+                results.append((existing[sha], False))
+            else:
+                results.append((created[sha], sha not in seen_new))
+                seen_new.add(sha)
+        return results
 
     def scan_directory(self, source_dir: Path, exts: Iterable[str] = MEDIA_EXTS) -> int:
         source_dir = Path(source_dir)
         if not source_dir.exists():
             return 0
         exts = set(exts) if exts else set(MEDIA_EXTS)
-        count = 0
-        for file_path in source_dir.rglob("*"):
-            if not file_path.is_file():
-                continue
-            if file_path.suffix.lower() not in exts:
-                continue
-            _, created = self.register_asset(file_path)
-            if created:
-                count += 1
+        files = [
+            file_path
+            for file_path in source_dir.rglob("*")
+            if file_path.is_file() and file_path.suffix.lower() in exts
+        ]
+        count = sum(1 for _, created in self.register_assets(files) if created)
         if not self.dry_run:
             self.session.commit()
         return count
@@ -316,19 +352,54 @@ class LegacyAssociationSource:
         return merged, person_map
 
 
+class AssetIndex:
+    """
+    Lookup tables over a list of assets for match_candidates. Build it once per
+    batch of legacy references instead of scanning every asset per reference.
+    """
+
+    def __init__(self, assets: Iterable[MediaAsset] = ()):
+        self._count = 0
+        self.by_id: Dict[int, MediaAsset] = {}
+        self.by_sha: Dict[str, MediaAsset] = {}
+        # Values are (position, asset) so matches come back in list order
+        self.by_path: Dict[str, List[Tuple[int, MediaAsset]]] = defaultdict(list)
+        self.by_basename: Dict[str, List[Tuple[int, MediaAsset]]] = defaultdict(list)
+        self.by_source: Dict[str, List[Tuple[int, MediaAsset]]] = defaultdict(list)
+        for asset in assets:
+            self.add(asset)
+
+    def add(self, asset: MediaAsset) -> None:
+        pos = self._count
+        self._count += 1
+        self.by_id.setdefault(asset.id, asset)
+        if asset.sha256:
+            self.by_sha.setdefault(asset.sha256, asset)
+        if asset.path:
+            self.by_path[normalize_path(asset.path)].append((pos, asset))
+        if asset.original_filename:
+            self.by_basename[normalize_path(asset.original_filename)].append((pos, asset))
+        if asset.source_path:
+            self.by_source[normalize_path(asset.source_path)].append((pos, asset))
+
+
 def match_candidates(
     legacy_path: Optional[str],
     legacy_name: Optional[str],
     assets: List[MediaAsset],
     media_dir: Path,
     ingest_dir: Path,
+    index: Optional[AssetIndex] = None,
 ) -> List[Dict[str, Any]]:
     candidates: List[Dict[str, Any]] = []
     if not legacy_path and not legacy_name:
         return candidates
+    if index is None:
+        index = AssetIndex(assets)
 
-    legacy_basename = Path(legacy_path or legacy_name or "").name
     norm_legacy = normalize_path(legacy_path or legacy_name or "")
+    # Take the basename after normalizing so Windows-style legacy paths split on any OS
+    norm_basename = norm_legacy.rstrip("/").rsplit("/", 1)[-1]
 
     def add_candidate(asset: MediaAsset, method: str, confidence: float) -> None:
         candidates.append({
@@ -341,19 +412,21 @@ def match_candidates(
         legacy_file = Path(legacy_path)
         if legacy_file.exists():
             sha = compute_sha256_file(legacy_file)
-            match = next((a for a in assets if a.sha256 == sha), None)
+            match = index.by_sha.get(sha)
             if match:
                 add_candidate(match, "sha256", 1.0)
                 return candidates
 
-    for asset in assets:
-        if asset.path:
-            if normalize_path(asset.path) == norm_legacy:
-                add_candidate(asset, "path", 0.95)
-        if asset.original_filename and normalize_path(asset.original_filename) == normalize_path(legacy_basename):
-            add_candidate(asset, "basename", 0.8)
-        if asset.source_path and normalize_path(asset.source_path) == norm_legacy:
-            add_candidate(asset, "source_path", 0.9)
+    hits = []
+    for rank, (table, key, method, confidence) in enumerate((
+        (index.by_path, norm_legacy, "path", 0.95),
+        (index.by_basename, norm_basename, "basename", 0.8),
+        (index.by_source, norm_legacy, "source_path", 0.9),
+    )):
+        for pos, asset in table.get(key, ()):
+            hits.append((pos, rank, asset, method, confidence))
+    for _, _, asset, method, confidence in sorted(hits, key=lambda hit: hit[:2]):
+        add_candidate(asset, method, confidence)
 
     return candidates
 
@@ -374,6 +447,7 @@ def legacy_link(
     xref_map = {p.xref: p.id for p in people if p.xref}
     name_map = {f"{(p.given or '').strip().lower()} {(p.surname or '').strip().lower()}".strip(): p.id for p in people}
     assets = session.execute(select(MediaAsset)).scalars().all()
+    asset_index = AssetIndex(assets)
     ingest = MediaIngestService(session, paths, verbose=verbose, dry_run=dry_run)
 
     report_path.parent.mkdir(parents=True, exist_ok=True)
@@ -395,7 +469,9 @@ def legacy_link(
                 name_key = f"{(legacy_person.get('given') or '').strip().lower()} {(legacy_person.get('surname') or '').strip().lower()}".strip()
                 person_id = name_map.get(name_key)
 
-        candidates = match_candidates(assoc.path, assoc.original_name, assets, paths.media_dir, paths.ingest_dir)
+        candidates = match_candidates(
+            assoc.path, assoc.original_name, assets, paths.media_dir, paths.ingest_dir, index=asset_index
+        )
         if not candidates and assoc.path:
             search_name = Path(assoc.path).name
             for root in (paths.media_dir, paths.ingest_dir):
@@ -404,6 +480,7 @@ def legacy_link(
                     asset, _ = ingest.register_asset(candidate_file)
                     candidates = [{"asset_id": asset.id, "method": "basename_disk", "confidence": 0.85}]
                     assets.append(asset)
+                    asset_index.add(asset)
                     break
 
         best = max(candidates, key=lambda c: c["confidence"], default=None)
@@ -413,7 +490,7 @@ def legacy_link(
 
         report_rows.append({
             "legacy_ref": assoc.path or assoc.original_name or "",
-            "current_path": _asset_path_by_id(assets, asset_id),
+            "current_path": (asset_index.by_id[asset_id].path or "") if asset_id in asset_index.by_id else "",
             "person_id": person_id or "",
             "person_name": _person_name_by_id(people, person_id),
             "match_method": method,
@@ -450,13 +527,6 @@ def legacy_link(
     return {"applied": applied, "report": str(report_path), "candidates": len(report_rows)}
 
 
-def _asset_path_by_id(assets: Iterable[MediaAsset], asset_id: Optional[int]) -> str:
-    for asset in assets:
-        if asset.id == asset_id:
-            return asset.path or ""
-    return ""
-
-
 def _person_name_by_id(people_rows: Iterable[Tuple[Any, Any, Any, Any]], person_id: Optional[int]) -> str:
     for pid, given, surname, _ in people_rows:
         if pid == person_id:
@@ -491,8 +561,7 @@ def run_watch_loop(
                 seen[key] = mtime
                 new_files.append(file_path)
 
-            for file_path in new_files:
-                ingest.register_asset(file_path)
+            ingest.register_assets(new_files)
 
             if ocr and new_files:
                 ocr_service = OCRService(ingest, lang=lang, verbose=verbose, dry_run=dry_run)
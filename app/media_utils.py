@@ -1,8 +1,9 @@
 """Media utilities for thumbnail generation and file handling."""
 import hashlib
 import os
+import tempfile
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple
 
 from PIL import Image
 
@@ -13,9 +14,38 @@ SUPPORTED_IMAGE_TYPES = {
     "image/webp": [".webp"],
 }
 
-def compute_sha256(content: bytes) -> str:
-    """Compute SHA256 hash of file content."""
-    return hashlib.sha256(content).hexdigest()
+def compute_sha256_file(path) -> str:
+    """Compute SHA256 hash of a file without reading it into memory."""
+    with open(path, "rb") as fh:
+        if hasattr(hashlib, "file_digest"):
+            # Python 3.11+: the read/update loop runs in C over one reused buffer
+            return hashlib.file_digest(fh, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(chunk)
+        return h.hexdigest()
+
+def save_upload_stream(stream: BinaryIO, dest_dir: str) -> Tuple[str, str, int]:
+    """
+    Copy an upload stream to a temporary file in dest_dir, hashing each chunk as
+    it is written so the bytes are only traversed once.
+
+    Returns (temp_path, sha256, size_bytes). The caller moves the temp file into
+    place with os.replace, or removes it if the content is already stored.
+    """
+    h = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=dest_dir, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                h.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return temp_path, h.hexdigest(), size
 
 def is_image(mime_type: str) -> bool:
     """Check if mime type is a supported image format."""
@@ -42,6 +72,9 @@ def create_thumbnail(
     """
     try:
         with Image.open(source_path) as img:
+            # JPEGs can be decoded straight at 1/2..1/8 scale; keep 2x the thumbnail
+            # size so the final resample still has detail to work with (no-op for other formats)
+            img.draft("RGB", (THUMBNAIL_SIZE[0] * 2, THUMBNAIL_SIZE[1] * 2))
             # Convert RGBA to RGB if needed
             if img.mode in ('RGBA', 'LA', 'P'):
                 background = Image.new('RGB', img.size, (255, 255, 255))
@@ -53,7 +86,8 @@ def create_thumbnail(
                 img = img.convert('RGB')
             
             # Create thumbnail
-            img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+            # reducing_gap: cheap box reduce to ~2x the target first, then LANCZOS for the last step
+            img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS, reducing_gap=2.0)
             
             # Save thumbnail
             thumb_path = os.path.join(thumbnail_dir, f"thumb_{base_name}.jpg")
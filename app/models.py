@@ -208,6 +208,7 @@ class MediaLink(Base):
     family: Mapped[Optional["Family"]] = relationship("Family", back_populates="media_links", foreign_keys=[family_id])
 
     __table_args__ = (
+        Index('idx_media_links_asset', 'asset_id'),
         Index('idx_media_links_person', 'person_id'),
         Index('idx_media_links_family', 'family_id'),
     )
@@ -292,7 +293,7 @@ class DateNormalization(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     entity_type: Mapped[str] = mapped_column(String(50), nullable=False)  # 'person' | 'event' | 'family'
-    entity_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)  # looked up via idx_date_norm_entity
     raw_value: Mapped[str] = mapped_column(String(255), nullable=False)
     normalized: Mapped[Optional[str]] = mapped_column(String(25), nullable=True)  # yyyy or yyyy-MM or yyyy-MM-dd
     precision: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)  # year|month|day|range
@@ -3,7 +3,8 @@ from __future__ import annotations
 from flask import Blueprint, jsonify, request, current_app, send_from_directory, render_template
 from typing import Any, Dict, List, Iterable, Tuple
 from werkzeug.utils import secure_filename
-from sqlalchemy import select, or_, and_, func, update, text
+from sqlalchemy import select, insert, or_, and_, func, update, text, exists, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 import os
@@ -36,7 +37,7 @@ from .models import (
     PlaceVariant,
 )
 from .gedcom import parse_gedcom, to_summary
-from .media_utils import compute_sha256, is_image, create_thumbnail, safe_filename
+from .media_utils import compute_sha256_file, is_image, create_thumbnail, safe_filename, save_upload_stream
 from .rmtree import (
     collect_media_associations,
     collect_media_locations,
@@ -54,6 +55,8 @@ api_bp = Blueprint("api", __name__, url_prefix="/api")
 ui_bp = Blueprint("ui", __name__)
 RELATIONSHIP_PARENT_TYPE = "parent"
 MEDIA_EXTS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".tif", ".tiff", ".bmp", ".heic", ".mp4", ".mov", ".avi", ".mkv"}
+# Keeps IN (...) lists well under SQLite's bound-parameter limit during imports
+_IMPORT_IN_CHUNK = 500
 LOG_RESERVED_KEYS = {
     "name",
     "msg",
@@ -93,14 +96,6 @@ def _log_info(logger: logging.Logger, message: str, extra: Dict[str, Any] | None
     logger.info(message, extra=_sanitize_log_extra(extra))
 
 
-def _hash_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as fh:
-        for chunk in iter(lambda: fh.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
 def _media_paths() -> Tuple[Path, Path]:
     media_dir = Path(current_app.config["MEDIA_DIR"])
     ingest_dir = Path(current_app.config.get("MEDIA_INGEST_DIR") or media_dir)
@@ -135,7 +130,7 @@ def _register_media_from_path(file_path: Path, session, original_name: str | Non
     media_dir, _ = _media_paths()
     name = original_name or file_path.name
     mime = mimetypes.guess_type(name)[0] or "application/octet-stream"
-    sha = _hash_file(file_path)
+    sha = compute_sha256_file(file_path)
 
     existing = session.execute(select(MediaAsset).where(MediaAsset.sha256 == sha)).scalar_one_or_none()
     if existing:
@@ -288,14 +283,19 @@ def health():
 @api_bp.get("/people")
 def list_people():
     q = (request.args.get("q") or "").strip()
+    given = (request.args.get("given") or "").strip()
+    surname = (request.args.get("surname") or "").strip()
     session = get_session()
     
+    stmt = select(Person)
     if q:
-        stmt = select(Person).where(
-            or_(Person.given.like(f"%{q}%"), Person.surname.like(f"%{q}%"))
-        ).order_by(Person.surname, Person.given).limit(200)
-    else:
-        stmt = select(Person).order_by(Person.surname, Person.given).limit(200)
+        stmt = stmt.where(or_(Person.given.like(f"%{q}%"), Person.surname.like(f"%{q}%")))
+    # Exact name filters can use idx_persons_name instead of a LIKE scan
+    if surname:
+        stmt = stmt.where(Person.surname == surname)
+    if given:
+        stmt = stmt.where(Person.given == given)
+    stmt = stmt.order_by(Person.surname, Person.given).limit(200)
     
     people = session.execute(stmt).scalars().all()
     return jsonify([_person_to_dict(p) for p in people])
@@ -552,148 +552,104 @@ def import_gedcom():
             return jsonify({"error": "gedcom is required"}), 400
 
     indis, fams = parse_gedcom(text)
+    now = datetime.utcnow()
+
+    def xref_ids(model, xrefs: List[str]) -> Dict[str, int]:
+        ids: Dict[str, int] = {}
+        for start in range(0, len(xrefs), _IMPORT_IN_CHUNK):
+            chunk = xrefs[start:start + _IMPORT_IN_CHUNK]
+            ids.update(session.execute(select(model.xref, model.id).where(model.xref.in_(chunk))).all())
+        return ids
+
+    def upsert_rows(model, rows: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        # One executemany UPDATE for known xrefs and one multi-row INSERT for new ones
+        existing = xref_ids(model, list(rows))
+        updates = [{"id": existing[xref], **row} for xref, row in rows.items() if xref in existing]
+        inserts = [row for xref, row in rows.items() if xref not in existing]
+        if updates:
+            session.execute(update(model), updates)
+        if inserts:
+            session.execute(insert(model), inserts)
+            existing.update(xref_ids(model, [row["xref"] for row in inserts]))
+        return existing
+
+    xref_to_id = upsert_rows(Person, {
+        i.xref: {
+            "xref": i.xref,
+            "given": i.given or None,
+            "surname": i.surname or None,
+            "sex": i.sex or None,
+            "birth_date": i.birth_date or None,
+            "birth_place": i.birth_place or None,
+            "death_date": i.death_date or None,
+            "death_place": i.death_place or None,
+            "updated_at": now,
+        }
+        for i in indis.values()
+    })
 
-    def upsert_person(i):
-        stmt = select(Person).where(Person.xref == i.xref)
-        person = session.execute(stmt).scalar_one_or_none()
-        
-        if person:
-            person.given = i.given or None
-            person.surname = i.surname or None
-            person.sex = i.sex or None
-            person.birth_date = i.birth_date or None
-            person.birth_place = i.birth_place or None
-            person.death_date = i.death_date or None
-            person.death_place = i.death_place or None
-            person.updated_at = datetime.utcnow()
-        else:
-            person = Person(
-                xref=i.xref,
-                given=i.given or None,
-                surname=i.surname or None,
-                sex=i.sex or None,
-                birth_date=i.birth_date or None,
-                birth_place=i.birth_place or None,
-                death_date=i.death_date or None,
-                death_place=i.death_place or None,
-                updated_at=datetime.utcnow()
-            )
-            session.add(person)
-        session.flush()
-        return person.id
-
-    xref_to_id = {}
-    for i in indis.values():
-        xref_to_id[i.xref] = upsert_person(i)
+    fam_to_id = upsert_rows(Family, {
+        f.xref: {
+            "xref": f.xref,
+            "husband_person_id": xref_to_id.get(f.husb) if f.husb else None,
+            "wife_person_id": xref_to_id.get(f.wife) if f.wife else None,
+            "marriage_date": f.marriage_date or None,
+            "marriage_place": f.marriage_place or None,
+            "updated_at": now,
+        }
+        for f in fams.values()
+    })
 
-    def upsert_family(f):
-        stmt = select(Family).where(Family.xref == f.xref)
-        family = session.execute(stmt).scalar_one_or_none()
-        
-        husb_id = xref_to_id.get(f.husb) if f.husb else None
-        wife_id = xref_to_id.get(f.wife) if f.wife else None
-        
-        if family:
-            family.husband_person_id = husb_id
-            family.wife_person_id = wife_id
-            family.marriage_date = f.marriage_date or None
-            family.marriage_place = f.marriage_place or None
-            family.updated_at = datetime.utcnow()
-        else:
-            family = Family(
-                xref=f.xref,
-                husband_person_id=husb_id,
-                wife_person_id=wife_id,
-                marriage_date=f.marriage_date or None,
-                marriage_place=f.marriage_place or None,
-                updated_at=datetime.utcnow()
-            )
-            session.add(family)
-        session.flush()
-        
-        # Clear existing children and re-add
-        session.execute(
-            relationships.delete().where(
-                (relationships.c.parent_person_id == husb_id) | 
-                (relationships.c.parent_person_id == wife_id)
-            )
+    # Add children not already linked to their family
+    fam_ids = list(fam_to_id.values())
+    linked = set()
+    for start in range(0, len(fam_ids), _IMPORT_IN_CHUNK):
+        chunk = fam_ids[start:start + _IMPORT_IN_CHUNK]
+        linked.update(
+            session.execute(
+                select(family_children.c.family_id, family_children.c.child_person_id)
+                .where(family_children.c.family_id.in_(chunk))
+            ).all()
         )
-        
+    child_rows = []
+    for f in fams.values():
+        fam_id = fam_to_id[f.xref]
         for cxref in f.chil:
             cid = xref_to_id.get(cxref)
-            if cid:
-                # Add to family_children (we need to import this)
-                from .models import family_children
-                # Check if already exists
-                existing = session.execute(
-                    select(family_children).where(
-                        (family_children.c.family_id == family.id) &
-                        (family_children.c.child_person_id == cid)
-                    )
-                ).first()
-                if not existing:
-                    session.execute(
-                        family_children.insert().values(
-                            family_id=family.id,
-                            child_person_id=cid
-                        )
-                    )
-
-        for n_text in f.notes:
-            if n_text.strip():
-                note = Note(family_id=family.id, note_text=n_text.strip())
-                session.add(note)
-
-        return family.id
-
-    for f in fams.values():
-        upsert_family(f)
-
-    for i in indis.values():
-        pid = xref_to_id.get(i.xref)
-        if pid:
-            for n_text in i.notes:
-                if n_text.strip():
-                    note = Note(person_id=pid, note_text=n_text.strip())
-                    session.add(note)
+            if cid and (fam_id, cid) not in linked:
+                linked.add((fam_id, cid))
+                child_rows.append({"family_id": fam_id, "child_person_id": cid})
+    if child_rows:
+        session.execute(family_children.insert(), child_rows)
+
+    note_rows = [
+        {"family_id": fam_to_id[f.xref], "note_text": n_text.strip()}
+        for f in fams.values()
+        for n_text in f.notes
+        if n_text.strip()
+    ]
+    note_rows.extend(
+        {"person_id": xref_to_id[i.xref], "note_text": n_text.strip()}
+        for i in indis.values()
+        for n_text in i.notes
+        if n_text.strip()
+    )
+    if note_rows:
+        session.execute(insert(Note), note_rows)
 
-    # Rebuild relationships
+    # Rebuild relationships from every family's husband/wife and children
     session.execute(relationships.delete())
-    families = session.execute(select(Family)).scalars().all()
-    
-    for fam in families:
-        # Get children of this family
-        from .models import family_children
-        kids_stmt = select(family_children.c.child_person_id).where(
-            family_children.c.family_id == fam.id
+    for parent_col in (Family.husband_person_id, Family.wife_person_id):
+        session.execute(
+            relationships.insert()
+            .prefix_with("OR IGNORE")
+            .from_select(
+                ["parent_person_id", "child_person_id", "rel_type"],
+                select(parent_col, family_children.c.child_person_id, literal(RELATIONSHIP_PARENT_TYPE))
+                .join(family_children, family_children.c.family_id == Family.id)
+                .where(parent_col.is_not(None)),
+            )
         )
-        kids = session.execute(kids_stmt).scalars().all()
-        
-        for child_id in kids:
-            if fam.husband_person_id:
-                try:
-                    session.execute(
-                        relationships.insert().values(
-                            parent_person_id=fam.husband_person_id,
-                            child_person_id=child_id,
-                            rel_type=RELATIONSHIP_PARENT_TYPE
-                        )
-                    )
-                except Exception:
-                    # Relationship already exists, ignore
-                    pass
-            if fam.wife_person_id:
-                try:
-                    session.execute(
-                        relationships.insert().values(
-                            parent_person_id=fam.wife_person_id,
-                            child_person_id=child_id,
-                            rel_type=RELATIONSHIP_PARENT_TYPE
-                        )
-                    )
-                except Exception:
-                    # Relationship already exists, ignore
-                    pass
 
     session.commit()
     return jsonify({"imported": to_summary(indis, fams)})
@@ -1132,25 +1088,22 @@ def upload_media(person_id: int):
     media_dir = current_app.config["MEDIA_DIR"]
     os.makedirs(media_dir, exist_ok=True)
 
-    content = f.read()
-    sha = hashlib.sha256(content).hexdigest()
+    temp_path, sha, size_bytes = save_upload_stream(f.stream, media_dir)
     ext = os.path.splitext(safe)[1].lower()
     stored_name = f"{sha}{ext}" if ext else sha
     path = os.path.join(media_dir, stored_name)
 
-    if not os.path.exists(path):
-        with open(path, "wb") as out:
-            out.write(content)
+    if os.path.exists(path):
+        os.unlink(temp_path)
+    else:
+        os.replace(temp_path, path)
 
     mime = f.mimetype or "application/octet-stream"
-    size_bytes = len(content)
 
-    # Check if media asset already exists
-    stmt = select(MediaAsset).where(MediaAsset.sha256 == sha)
-    media_asset = session.execute(stmt).scalar_one_or_none()
-    
-    if not media_asset:
-        media_asset = MediaAsset(
+    # Insert the asset unless the sha256 unique index already has it; only then look it up
+    asset_id = session.execute(
+        sqlite_insert(MediaAsset)
+        .values(
             path=stored_name,
             original_filename=original_name,
             mime_type=mime,
@@ -1159,17 +1112,20 @@ def upload_media(person_id: int):
             status="assigned",
             source_path=None,
         )
-        session.add(media_asset)
-        session.flush()
-    
+        .on_conflict_do_nothing()
+        .returning(MediaAsset.id)
+    ).scalar_one_or_none()
+    if asset_id is None:
+        asset_id = session.execute(select(MediaAsset.id).where(MediaAsset.sha256 == sha)).scalar_one()
+
     # Create media link
     media_link = MediaLink(
-        asset_id=media_asset.id,
+        asset_id=asset_id,
         person_id=person_id
     )
     session.add(media_link)
     session.flush()
-    _refresh_asset_status(session, media_asset.id)
+    _refresh_asset_status(session, asset_id)
     session.commit()
 
     return jsonify({"stored": stored_name, "sha256": sha}), 201
@@ -1226,24 +1182,24 @@ def upload_media_v2():
 
     original_name = f.filename or "upload"
     mime = f.mimetype or "application/octet-stream"
-    content = f.read()
-    sha = compute_sha256(content)
-    size_bytes = len(content)
 
     media_dir = current_app.config["MEDIA_DIR"]
     os.makedirs(media_dir, exist_ok=True)
+    temp_path, sha, size_bytes = save_upload_stream(f.stream, media_dir)
 
     asset = session.execute(select(MediaAsset).where(MediaAsset.sha256 == sha)).scalar_one_or_none()
 
     if asset:
+        os.unlink(temp_path)
         stored_name = asset.path
     else:
         stored_name = safe_filename(original_name, sha, mime)
         file_path = os.path.join(media_dir, stored_name)
 
-        if not os.path.exists(file_path):
-            with open(file_path, "wb") as out:
-                out.write(content)
+        if os.path.exists(file_path):
+            os.unlink(temp_path)
+        else:
+            os.replace(temp_path, file_path)
 
         thumbnail_path = None
         thumb_width = None
@@ -1255,20 +1211,26 @@ def upload_media_v2():
                 thumbnail_full, thumb_width, thumb_height = thumb_result
                 thumbnail_path = os.path.basename(thumbnail_full)
 
-        asset = MediaAsset(
-            path=stored_name,
-            sha256=sha,
-            original_filename=original_name,
-            mime_type=mime,
-            size_bytes=size_bytes,
-            thumbnail_path=thumbnail_path,
-            thumb_width=thumb_width,
-            thumb_height=thumb_height,
-            status="unassigned",
-            source_path=None,
-        )
-        session.add(asset)
-        session.flush()
+        # DO NOTHING covers a concurrent upload of the same bytes winning the race
+        asset = session.execute(
+            sqlite_insert(MediaAsset)
+            .values(
+                path=stored_name,
+                sha256=sha,
+                original_filename=original_name,
+                mime_type=mime,
+                size_bytes=size_bytes,
+                thumbnail_path=thumbnail_path,
+                thumb_width=thumb_width,
+                thumb_height=thumb_height,
+                status="unassigned",
+                source_path=None,
+            )
+            .on_conflict_do_nothing()
+            .returning(MediaAsset)
+        ).scalar_one_or_none()
+        if asset is None:
+            asset = session.execute(select(MediaAsset).where(MediaAsset.sha256 == sha)).scalar_one()
 
     # Create link if requested
     link = None
@@ -1315,6 +1277,22 @@ def list_media_assets():
     return jsonify([_media_asset_dict(asset, include_id_key="id", link_count=link_count) for asset, link_count in rows])
 
 
+@api_bp.get("/media/assets/<int:asset_id>")
+def get_media_asset(asset_id: int):
+    """Fetch a single media asset with its link count."""
+    session = get_session()
+    row = session.execute(
+        select(MediaAsset, func.count(MediaLink.id).label("link_count"))
+        .outerjoin(MediaLink, MediaLink.asset_id == MediaAsset.id)
+        .where(MediaAsset.id == asset_id)
+        .group_by(MediaAsset.id)
+    ).one_or_none()
+    if row is None:
+        return jsonify({"error": "Asset not found"}), 404
+    asset, link_count = row
+    return jsonify(_media_asset_dict(asset, include_id_key="id", link_count=link_count))
+
+
 @api_bp.post("/media/assets/bulk")
 def media_assets_bulk():
     data = request.get_json(force=True, silent=False)
@@ -1470,8 +1448,7 @@ def analytics_orphaned_media():
     session = get_session()
     count = session.execute(
         select(func.count(MediaAsset.id))
-        .outerjoin(MediaLink, MediaLink.asset_id == MediaAsset.id)
-        .where(MediaLink.id.is_(None))
+        .where(~exists().where(MediaLink.asset_id == MediaAsset.id))
     ).scalar_one()
     
     return jsonify({"orphaned_count": count})
@@ -1482,8 +1459,7 @@ def analytics_people_without_media():
     session = get_session()
     count = session.execute(
         select(func.count(Person.id))
-        .outerjoin(MediaLink, MediaLink.person_id == Person.id)
-        .where(MediaLink.id.is_(None))
+        .where(~exists().where(MediaLink.person_id == Person.id))
     ).scalar_one()
     
     return jsonify({"people_without_media": count})
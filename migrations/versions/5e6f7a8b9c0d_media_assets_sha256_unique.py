@@ -0,0 +1,89 @@
+"""Merge duplicate media_assets by sha256 and make sha256 unique
+
+Revision ID: 5e6f7a8b9c0d
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-16 00:00:00.000000
+
+Upload dedup relies on a unique sha256 (INSERT ... ON CONFLICT DO NOTHING).
+Each duplicate row is merged into the lowest id for its hash: media links and
+derivations are repointed, then the duplicate rows are deleted. Every merge is
+logged with the deleted ids and paths; the files themselves are left on disk.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5e6f7a8b9c0d"
+down_revision = "1a2b3c4d5e6f"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if any(ix["unique"] and ix["column_names"] == ["sha256"] for ix in inspector.get_indexes("media_assets")):
+        return
+
+    rows = bind.execute(
+        sa.text(
+            """
+            SELECT a.sha256, k.keep_id, a.id, a.path
+            FROM media_assets a
+            JOIN (
+                SELECT sha256, MIN(id) AS keep_id FROM media_assets
+                WHERE sha256 IS NOT NULL GROUP BY sha256 HAVING COUNT(*) > 1
+            ) k ON k.sha256 = a.sha256
+            WHERE a.id <> k.keep_id
+            ORDER BY a.sha256, a.id
+            """
+        )
+    ).fetchall()
+
+    if rows:
+        tables = set(inspector.get_table_names())
+        refs = [("media_links", "asset_id")]
+        if "media_derivations" in tables:
+            refs += [("media_derivations", "original_asset_id"), ("media_derivations", "derived_asset_id")]
+
+        merged = {}
+        for sha256, keep_id, dupe_id, path in rows:
+            merged.setdefault((sha256, keep_id), []).append((dupe_id, path))
+        for (sha256, keep_id), dupes in merged.items():
+            logger.warning(
+                "Merging media_assets sha256=%s into id %d; deleting ids %s (files left on disk: %s)",
+                sha256,
+                keep_id,
+                ", ".join(str(dupe_id) for dupe_id, _ in dupes),
+                ", ".join(path for _, path in dupes),
+            )
+            params = {"keep_id": keep_id, "dupe_ids": [dupe_id for dupe_id, _ in dupes]}
+            for table, column in refs:
+                bind.execute(
+                    sa.text(f"UPDATE {table} SET {column} = :keep_id WHERE {column} IN :dupe_ids").bindparams(
+                        sa.bindparam("dupe_ids", expanding=True)
+                    ),
+                    params,
+                )
+            bind.execute(
+                sa.text("DELETE FROM media_assets WHERE id IN :dupe_ids").bindparams(
+                    sa.bindparam("dupe_ids", expanding=True)
+                ),
+                params,
+            )
+
+    # A non-unique index may already carry this name on databases built outside alembic
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_media_assets_sha256"))
+    op.create_index("ix_media_assets_sha256", "media_assets", ["sha256"], unique=True)
+
+
+def downgrade() -> None:
+    # Merged rows are not restored; only the uniqueness guarantee is dropped
+    op.drop_index("ix_media_assets_sha256", table_name="media_assets")
@@ -1,4 +1,3 @@
-import os
 import sys
 
 try:
@@ -33,9 +32,6 @@ except (ModuleNotFoundError, ImportError) as e:
 app = create_app()
 
 if __name__ == "__main__":
-    # Environment-driven configuration for Termux and other environments
-    host = os.environ.get("APP_BIND_HOST", "127.0.0.1")
-    port = int(os.environ.get("APP_PORT", "3001"))
-    debug = os.environ.get("APP_DEBUG", "0") == "1"
-    
-    app.run(host=host, port=port, debug=debug)
+    # Environment-driven configuration for Termux and other environments (see app/config.py)
+    settings = app.config["APP_CONFIG"]
+    app.run(host=settings.bind_host, port=settings.port, debug=settings.debug)
@@ -1,6 +1,33 @@
 import os
 import sys
+import tempfile
+
+import pytest
 
 repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if repo_root not in sys.path:
     sys.path.insert(0, repo_root)
+
+
+def _tmp_root():
+    """/dev/shm (RAM-backed tmpfs) when writable, else None for the platform default."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return None
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _ram_tempdir():
+    """Put the tests' TemporaryDirectory media and scratch files in RAM unless TMPDIR is set."""
+    root = _tmp_root()
+    if root is None or os.environ.get("TMPDIR"):
+        yield
+        return
+    previous = tempfile.tempdir
+    tempfile.tempdir = root
+    try:
+        yield
+    finally:
+        tempfile.tempdir = previous
+
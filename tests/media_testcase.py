@@ -0,0 +1,51 @@
+"""Shared setup for the media test classes (not collected: no test_ prefix)."""
+import functools
+import io
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from app import create_app
+from app.db import get_engine, get_scoped_session
+from app.models import Base
+
+
+@functools.lru_cache(maxsize=32)
+def image_bytes(width, height, color, format="PNG"):
+    """Encode each distinct solid-colour test image once; tests only need the bytes."""
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buf, format)
+    return buf.getvalue()
+
+
+class MediaTestCase(unittest.TestCase):
+    """One app and in-memory database per class; setUp only clears rows and swaps media dirs."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = create_app({"TESTING": True})
+        cls.engine = get_engine()
+        cls.Session = get_scoped_session()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+
+    def setUp(self):
+        with self.engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.media_dir = os.path.join(self.tmpdir.name, "media")
+        self.media_ingest = os.path.join(self.tmpdir.name, "media_ingest")
+        os.makedirs(self.media_dir, exist_ok=True)
+        os.makedirs(self.media_ingest, exist_ok=True)
+        self.app.config.update(MEDIA_DIR=self.media_dir, MEDIA_INGEST_DIR=self.media_ingest)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.Session.remove()
+        self.tmpdir.cleanup()
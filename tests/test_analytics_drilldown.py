@@ -4,31 +4,37 @@ import unittest
 
 from app import create_app
 from app.db import get_session, get_engine
-from app.models import Base, Person, Family
+from app.models import Person, Family
 
 
 class TestAnalyticsDrilldown(unittest.TestCase):
-    def setUp(self):
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = os.path.join(self.tmpdir.name, "test.sqlite")
-        self.app = create_app(
+    @classmethod
+    def setUpClass(cls):
+        # The drilldown tests only read, so one app and one seeded database serve them all
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.db_path = os.path.join(cls.tmpdir.name, "test.sqlite")
+        cls.app = create_app(
             {
                 "TESTING": True,
-                "DATABASE": self.db_path,
-                "MEDIA_DIR": os.path.join(self.tmpdir.name, "media"),
-                "MEDIA_INGEST_DIR": os.path.join(self.tmpdir.name, "media_ingest"),
+                "DATABASE": cls.db_path,
+                "MEDIA_DIR": os.path.join(cls.tmpdir.name, "media"),
+                "MEDIA_INGEST_DIR": os.path.join(cls.tmpdir.name, "media_ingest"),
             }
         )
-        with self.app.app_context():
-            engine = get_engine()
-            Base.metadata.create_all(engine)
-            self._seed()
-        self.client = self.app.test_client()
+        with cls.app.app_context():
+            cls.engine = get_engine()
+            cls._seed()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+        cls.tmpdir.cleanup()
 
-    def tearDown(self):
-        self.tmpdir.cleanup()
+    def setUp(self):
+        self.client = self.app.test_client()
 
-    def _seed(self):
+    @staticmethod
+    def _seed():
         session = get_session()
         p1 = Person(given="John", surname="Smith", birth_date="1 JAN 1980", death_date="1 JAN 2020", birth_place="Berlin", death_place="Paris")
         p2 = Person(given="Jane", surname="Smith", birth_date="1 FEB 1982", death_date=None, birth_place="Berlin", death_place=None)
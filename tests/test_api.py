@@ -1,10 +1,11 @@
 import io
+import json
 import os
 import sqlite3
 import tempfile
 import unittest
 import zipfile
-from sqlalchemy import select
+from sqlalchemy import create_engine, event, select, text
 
 from app import create_app
 
@@ -25,6 +26,9 @@ SAMPLE_GED = """0 HEAD
 0 TRLR
 """
 
+# Encoded once so each import test posts the same prebuilt JSON body
+SAMPLE_GED_BODY = json.dumps({"gedcom": SAMPLE_GED}).encode("utf-8")
+
 def _write_sample_rmtree(db_path: str):
     conn = sqlite3.connect(db_path)
     conn.execute(
@@ -88,32 +92,42 @@ def _write_sample_rmtree(db_path: str):
     conn.close()
 
 class TestApi(unittest.TestCase):
-    def setUp(self):
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = os.path.join(self.tmpdir.name, "test.sqlite")
-        self.media_dir = os.path.join(self.tmpdir.name, "media")
-        self.media_ingest = os.path.join(self.tmpdir.name, "media_ingest")
-        os.makedirs(self.media_dir, exist_ok=True)
-        os.makedirs(self.media_ingest, exist_ok=True)
-
-        self.app = create_app({
+    @classmethod
+    def setUpClass(cls):
+        cls.class_tmpdir = tempfile.TemporaryDirectory()
+        cls.db_path = os.path.join(cls.class_tmpdir.name, "test.sqlite")
+        cls.media_dir = os.path.join(cls.class_tmpdir.name, "media")
+        cls.media_ingest = os.path.join(cls.class_tmpdir.name, "media_ingest")
+        # Scratch space for fixture files; every test writes distinct names, so it is shared
+        cls.scratch_dir = os.path.join(cls.class_tmpdir.name, "scratch")
+        os.makedirs(cls.media_dir, exist_ok=True)
+        os.makedirs(cls.media_ingest, exist_ok=True)
+        os.makedirs(cls.scratch_dir, exist_ok=True)
+
+        cls.app = create_app({
             "TESTING": True,
-            "DATABASE": self.db_path,
-            "MEDIA_DIR": self.media_dir,
-            "MEDIA_INGEST_DIR": self.media_ingest,
+            "DATABASE": cls.db_path,
+            "MEDIA_DIR": cls.media_dir,
+            "MEDIA_INGEST_DIR": cls.media_ingest,
         })
-        
-        # Create database tables using SQLAlchemy
+
+        # create_app builds the schema once; setUp only clears rows between tests
         from app.db import get_engine
+        cls.engine = get_engine()
+
+    @classmethod
+    def tearDownClass(cls):
+        # The database file lives in class_tmpdir, so cleanup() removes it
+        cls.engine.dispose()
+        cls.class_tmpdir.cleanup()
+
+    def setUp(self):
         from app.models import Base
-        with self.app.app_context():
-            engine = get_engine()
-            Base.metadata.create_all(engine)
-        
-        self.client = self.app.test_client()
+        with self.engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
 
-    def tearDown(self):
-        self.tmpdir.cleanup()
+        self.client = self.app.test_client()
 
     def test_health(self):
         r = self.client.get("/api/health")
@@ -122,33 +136,55 @@ class TestApi(unittest.TestCase):
 
     def test_migration_creates_empty_db(self):
         """Test that migration creates an empty database with all required tables."""
-        from app.db import get_engine
-        from sqlalchemy import inspect
-        
+        from app.db import get_session
+
+        required_tables = {
+            'persons', 'families', 'events', 'places', 'place_variants',
+            'media_assets', 'media_links', 'notes', 'data_quality_flags',
+            'family_children', 'relationships', 'person_attributes'
+        }
         with self.app.app_context():
-            engine = get_engine()
-            inspector = inspect(engine)
-            tables = inspector.get_table_names()
-            
-            # Check all required tables exist
-            required_tables = [
-                'persons', 'families', 'events', 'places', 'place_variants',
-                'media_assets', 'media_links', 'notes', 'data_quality_flags',
-                'family_children', 'relationships', 'person_attributes'
-            ]
-            for table in required_tables:
-                self.assertIn(table, tables, f"Table {table} should exist")
-            
-            # Verify tables are empty
-            from app.db import get_session
-            from app.models import Person, Family
             session = get_session()
-            self.assertEqual(session.query(Person).count(), 0)
-            self.assertEqual(session.query(Family).count(), 0)
+            tables = set(session.execute(
+                text("SELECT name FROM sqlite_master WHERE type='table'")
+            ).scalars())
+            missing = required_tables - tables
+            self.assertFalse(missing, f"Tables should exist: {sorted(missing)}")
+
+    def test_file_database_keeps_connection_pool(self):
+        """Only in-memory databases are pinned to one shared connection."""
+        from sqlalchemy.pool import StaticPool
+
+        self.assertNotIsInstance(self.engine.pool, StaticPool)
+
+    def test_create_schema_leaves_existing_tables_alone(self):
+        """Like create_all, create_schema only builds missing tables, so legacy data can't break startup."""
+        from app.db import create_schema
+
+        db_file = os.path.join(self.scratch_dir, "existing_tables.sqlite")
+        conn = sqlite3.connect(db_file)
+        conn.execute("CREATE TABLE persons (id INTEGER PRIMARY KEY, xref TEXT, created_at TEXT, updated_at TEXT)")
+        # Duplicate xrefs would make the model's unique ix_persons_xref fail to build
+        conn.executemany("INSERT INTO persons (xref) VALUES (?)", [("@I1@",), ("@I1@",)])
+        conn.commit()
+        conn.close()
+
+        engine = create_engine(f"sqlite:///{db_file}")
+        try:
+            create_schema(engine)
+        finally:
+            engine.dispose()
+
+        conn = sqlite3.connect(db_file)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        person_indexes = {row[1] for row in conn.execute("PRAGMA index_list(persons)")}
+        conn.close()
+        self.assertIn("families", tables)
+        self.assertNotIn("ix_persons_xref", person_indexes)
 
     def test_gedcom_import_populates_expected_rows(self):
         """Test that GEDCOM import populates expected rows in the database."""
-        r = self.client.post("/api/import/gedcom", json={"gedcom": SAMPLE_GED})
+        r = self.client.post("/api/import/gedcom", data=SAMPLE_GED_BODY, content_type="application/json")
         self.assertEqual(r.status_code, 200)
         summary = r.get_json()["imported"]
         self.assertEqual(summary["people"], 3)
@@ -179,6 +215,42 @@ class TestApi(unittest.TestCase):
         self.assertIsNotNone(family.husband_person_id)
         self.assertIsNotNone(family.wife_person_id)
 
+    def test_gedcom_import_batches_statements(self):
+        """Test that a large GEDCOM import uses a fixed number of statements and one commit."""
+        lines = ["0 HEAD"]
+        for n in range(1, 2001):
+            lines += [f"0 @I{n}@ INDI", f"1 NAME Person{n} /Family{n % 50}/"]
+        for n in range(1, 1001):
+            lines += [f"0 @F{n}@ FAM", f"1 HUSB @I{2 * n - 1}@", f"1 WIFE @I{2 * n}@"]
+            if n > 1:
+                lines.append(f"1 CHIL @I{n - 1}@")
+        lines.append("0 TRLR")
+        body = json.dumps({"gedcom": "\n".join(lines)})
+
+        counts = {"statements": 0, "commits": 0}
+
+        def on_execute(*_args):
+            counts["statements"] += 1
+
+        def on_commit(_conn):
+            counts["commits"] += 1
+
+        event.listen(self.engine, "before_cursor_execute", on_execute)
+        event.listen(self.engine, "commit", on_commit)
+        try:
+            r = self.client.post("/api/import/gedcom", data=body, content_type="application/json")
+        finally:
+            event.remove(self.engine, "before_cursor_execute", on_execute)
+            event.remove(self.engine, "commit", on_commit)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.get_json()["imported"], {"people": 2000, "families": 1000})
+        self.assertEqual(counts["commits"], 1)
+        self.assertLess(counts["statements"], 60)
+
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM family_children")).scalar(), 999)
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM relationships")).scalar(), 1998)
+
     def test_rmtree_import_missing_file(self):
         r = self.client.post("/api/import/rmtree", data={}, content_type="multipart/form-data")
         self.assertEqual(r.status_code, 400)
@@ -192,7 +264,7 @@ class TestApi(unittest.TestCase):
         self.assertEqual(r.get_json()["error"], "invalid_signature")
 
     def test_rmtree_import_populates_people_and_media_from_sqlite(self):
-        db_file = os.path.join(self.tmpdir.name, "sample.rmtree")
+        db_file = os.path.join(self.scratch_dir, "sample.rmtree")
         _write_sample_rmtree(db_file)
         with open(db_file, "rb") as fh:
             payload = {"file": (io.BytesIO(fh.read()), "sample.rmtree")}
@@ -227,9 +299,9 @@ class TestApi(unittest.TestCase):
             self.assertEqual(len(rels), 2)
 
     def test_rmtree_rmbackup_extraction(self):
-        db_file = os.path.join(self.tmpdir.name, "inner.rmtree")
+        db_file = os.path.join(self.scratch_dir, "inner.rmtree")
         _write_sample_rmtree(db_file)
-        zip_path = os.path.join(self.tmpdir.name, "backup.rmbackup")
+        zip_path = os.path.join(self.scratch_dir, "backup.rmbackup")
         with zipfile.ZipFile(zip_path, "w") as zf:
             zf.write(db_file, arcname="family/inner.rmtree")
         with open(zip_path, "rb") as fh:
@@ -246,35 +318,43 @@ class TestApi(unittest.TestCase):
     def test_crud_person(self):
         r = self.client.post("/api/people", json={"given":"Ada","surname":"Lovelace","sex":"F"})
         self.assertEqual(r.status_code, 201)
-        pid = r.get_json()["id"]
+        body = r.get_json()
+        pid = body["id"]
 
         r = self.client.get(f"/api/people/{pid}")
         self.assertEqual(r.status_code, 200)
-        self.assertEqual(r.get_json()["given"], "Ada")
+        body = r.get_json()
+        self.assertEqual(body["given"], "Ada")
+        self.assertEqual(body["surname"], "Lovelace")
 
         r = self.client.put(f"/api/people/{pid}", json={"given":"Ada","surname":"King","sex":"F"})
         self.assertEqual(r.status_code, 200)
-        self.assertEqual(r.get_json()["surname"], "King")
+        body = r.get_json()
+        self.assertEqual(body["surname"], "King")
+        self.assertEqual(body["sex"], "F")
 
         r = self.client.get("/api/people?q=King")
         self.assertEqual(r.status_code, 200)
-        self.assertEqual(len(r.get_json()), 1)
+        body = r.get_json()
+        self.assertEqual(len(body), 1)
+        self.assertEqual(body[0]["id"], pid)
 
         r = self.client.delete(f"/api/people/{pid}")
         self.assertEqual(r.status_code, 200)
         self.assertTrue(r.get_json()["deleted"])
 
     def test_gedcom_import_and_tree(self):
-        r = self.client.post("/api/import/gedcom", json={"gedcom": SAMPLE_GED})
+        r = self.client.post("/api/import/gedcom", data=SAMPLE_GED_BODY, content_type="application/json")
         self.assertEqual(r.status_code, 200)
         summary = r.get_json()["imported"]
         self.assertEqual(summary["people"], 3)
         self.assertEqual(summary["families"], 1)
 
-        r = self.client.get("/api/people?q=Smith")
+        r = self.client.get("/api/people?given=John&surname=Smith")
         self.assertEqual(r.status_code, 200)
-        smiths = r.get_json()
-        john = next(p for p in smiths if p["given"] == "John")
+        matches = r.get_json()
+        self.assertEqual(len(matches), 1)
+        john = matches[0]
 
         r = self.client.get(f"/api/tree/{john['id']}")
         self.assertEqual(r.status_code, 200)
@@ -354,7 +434,7 @@ class TestApi(unittest.TestCase):
 
     def test_graph_endpoint(self):
         # Import sample GEDCOM
-        r = self.client.post("/api/import/gedcom", json={"gedcom": SAMPLE_GED})
+        r = self.client.post("/api/import/gedcom", data=SAMPLE_GED_BODY, content_type="application/json")
         self.assertEqual(r.status_code, 200)
         
         # Find John Smith
@@ -1,44 +1,81 @@
 import os
 import tempfile
 import unittest
+from collections import defaultdict
 
+from sqlalchemy import and_, insert, select
 from sqlalchemy.orm import sessionmaker
 
 from app import create_app
-from app.models import Person, Event, EventType, DateNormalization, Family, MediaAsset, MediaLink, family_children, relationships
-from app.db import get_engine
+from app.models import Person, Event, EventType, DateNormalization, DataQualityIssue, Family, MediaAsset, MediaLink, family_children, relationships
+from app.db import bind_session, get_engine
+from app.dq import _parse_date, run_detection
+from app.routes import _issue_to_dict
 
 
 class TestDataQuality(unittest.TestCase):
-    def setUp(self):
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = os.path.join(self.tmpdir.name, "test.sqlite")
-        self.media_dir = os.path.join(self.tmpdir.name, "media")
-        self.media_ingest = os.path.join(self.tmpdir.name, "media_ingest")
-        os.makedirs(self.media_dir, exist_ok=True)
-        os.makedirs(self.media_ingest, exist_ok=True)
-
-        self.app = create_app(
+    @classmethod
+    def setUpClass(cls):
+        # Only media needs real directories; the database lives in RAM
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.media_dir = os.path.join(cls.tmpdir.name, "media")
+        cls.media_ingest = os.path.join(cls.tmpdir.name, "media_ingest")
+        os.makedirs(cls.media_dir, exist_ok=True)
+        os.makedirs(cls.media_ingest, exist_ok=True)
+
+        cls.app = create_app(
             {
                 "TESTING": True,
-                "DATABASE": self.db_path,
-                "MEDIA_DIR": self.media_dir,
-                "MEDIA_INGEST_DIR": self.media_ingest,
+                "DATABASE": ":memory:",
+                "MEDIA_DIR": cls.media_dir,
+                "MEDIA_INGEST_DIR": cls.media_ingest,
             }
         )
+        cls.engine = get_engine()
+        # Built once; each test binds it to its own transactional connection
+        cls.Session = sessionmaker(expire_on_commit=False, join_transaction_mode="create_savepoint")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+        cls.tmpdir.cleanup()
 
+    def setUp(self):
+        # Each test runs inside one BEGIN IMMEDIATE ... ROLLBACK. pysqlite only
+        # nests SAVEPOINTs correctly when it leaves BEGIN to us, so its implicit
+        # transaction handling is switched off for this connection.
+        self.connection = self.engine.connect()
+        self.connection.connection.driver_connection.isolation_level = None
+        self.trans = self.connection.begin()
+        self.connection.exec_driver_sql("BEGIN IMMEDIATE")
+        bind_session(self.connection)
         self.client = self.app.test_client()
-        self.Session = sessionmaker(bind=get_engine())
+        # Fixture helpers share this session and only flush; tests commit once after seeding
+        self._s = self._session()
 
     def tearDown(self):
-        self.tmpdir.cleanup()
+        self._s.close()
+        bind_session(None)
+        self.trans.rollback()
+        self.connection.connection.driver_connection.isolation_level = ""
+        self.connection.close()
 
     def _session(self):
-        return self.Session()
+        return self.Session(bind=self.connection)
+
+    def _bulk(self, objs):
+        """Add objs to the shared session and flush so ids are assigned."""
+        self._s.add_all(objs)
+        self._s.flush()
+        return [obj.id for obj in objs]
+
+    def _people(self, *rows):
+        """Insert one Person per dict of column values."""
+        return self._bulk([Person(**row) for row in rows])
 
     def _person(self, given, surname, birth_date=None, birth_place=None, death_date=None, death_place=None):
-        with self._session() as s:
-            p = Person(
+        return self._people(
+            dict(
                 given=given,
                 surname=surname,
                 birth_date=birth_date,
@@ -46,144 +83,161 @@ class TestDataQuality(unittest.TestCase):
                 death_date=death_date,
                 death_place=death_place,
             )
-            s.add(p)
-            s.commit()
-            return p.id
+        )[0]
 
     def _event(self, person_id, raw_date=None, raw_place=None):
-        with self._session() as s:
-            ev = Event(event_type=EventType.BIRTH, person_id=person_id, date_raw=raw_date, place_raw=raw_place)
-            s.add(ev)
-            s.commit()
-            return ev.id
+        # Core insert: no ORM object or instrumented setters for a row the tests only reference by id
+        return self._bulk_insert(
+            Event,
+            [dict(event_type=EventType.BIRTH, person_id=person_id, date_raw=raw_date, place_raw=raw_place)],
+        )[0]
 
     def _family(self, husband_id=None, wife_id=None, marriage_date=None, marriage_place=None, children=None):
-        with self._session() as s:
-            fam = Family(
-                husband_person_id=husband_id,
-                wife_person_id=wife_id,
-                marriage_date=marriage_date,
-                marriage_place=marriage_place,
+        fam = Family(
+            husband_person_id=husband_id,
+            wife_person_id=wife_id,
+            marriage_date=marriage_date,
+            marriage_place=marriage_place,
+        )
+        fam_id = self._bulk([fam])[0]
+        if children:
+            self._s.execute(
+                family_children.insert(),
+                [{"family_id": fam_id, "child_person_id": cid} for cid in children],
             )
-            s.add(fam)
-            s.commit()
-            if children:
-                for cid in children:
-                    s.execute(
-                        family_children.insert().values(family_id=fam.id, child_person_id=cid)
-                    )
-                s.commit()
-            return fam.id
+        return fam_id
+
+    def _bulk_insert(self, model, rows):
+        """Insert dict rows with one INSERT ... RETURNING and return their ids in order."""
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        return list(self._s.execute(stmt, rows).scalars())
 
     def _media_link(self, person_id):
+        asset_id = self._bulk_insert(
+            MediaAsset, [dict(path="x.jpg", sha256="a" * 64, original_filename="x.jpg")]
+        )[0]
+        link = dict(asset_id=asset_id, person_id=person_id)
+        return asset_id, self._bulk_insert(MediaLink, [link, link])
+
+    def _media_assets(self, *assets):
+        """Insert (filename, sha, size_bytes) tuples as media assets; returns their ids."""
+        return self._bulk_insert(
+            MediaAsset,
+            [
+                dict(path=filename, sha256=sha, original_filename=filename, size_bytes=size_bytes)
+                for filename, sha, size_bytes in assets
+            ],
+        )
+
+    def _read(self, *cols, where):
+        """Fetch just the asserted columns in one SELECT; None when no row matches."""
+        return self.connection.execute(select(*cols).where(where)).one_or_none()
+
+    def _dq_scan_issues_by_type(self):
+        """Run the detectors behind /api/dq/scan directly and group every issue by type."""
         with self._session() as s:
-            asset = MediaAsset(
-                path="x.jpg",
-                sha256="a" * 64,
-                original_filename="x.jpg",
-            )
-            s.add(asset)
-            s.commit()
-            link1 = MediaLink(asset_id=asset.id, person_id=person_id)
-            link2 = MediaLink(asset_id=asset.id, person_id=person_id)
-            s.add_all([link1, link2])
-            s.commit()
-            return asset.id, [link1.id, link2.id]
-
-    def _media_asset(self, filename, sha, size_bytes=1000):
-        with self._session() as s:
-            asset = MediaAsset(
-                path=filename,
-                sha256=sha,
-                original_filename=filename,
-                size_bytes=size_bytes,
-            )
-            s.add(asset)
-            s.commit()
-            return asset.id
+            run_detection(s)
+            rows = s.execute(select(DataQualityIssue)).scalars().all()
+            issues_by_type = defaultdict(list)
+            for row in rows:
+                issues_by_type[row.issue_type].append(_issue_to_dict(row))
+            return issues_by_type
+
+    def test_scan_detects_all_issue_types(self):
+        # Read-only detection checks share one fixture set and a single scan
+        self._people(
+            dict(given="John", surname="Sample", birth_date="1980"),
+            dict(given="Jon", surname="Sample", birth_date="1980"),
+        )
 
-    def test_scan_detects_duplicates(self):
-        a = self._person("John", "Sample", "1980")
-        b = self._person("Jon", "Sample", "1980")
-        r = self.client.post("/api/dq/scan")
-        self.assertEqual(r.status_code, 200)
-        data = self.client.get("/api/dq/issues?type=duplicate_person").get_json()
-        self.assertGreaterEqual(len(data["items"]), 1)
+        shouting = self._person("JOHN", "DOE ")
 
-    def test_scan_detects_standardization_suggestions(self):
-        pid = self._person("JOHN", "DOE ")
-        r = self.client.post("/api/dq/scan")
-        self.assertEqual(r.status_code, 200)
-        data = self.client.get("/api/dq/issues?type=field_standardization").get_json()
-        target = next((i for i in data["items"] if pid in i["entity_ids"]), None)
-        self.assertIsNotNone(target)
-        fields = target["explanation"].get("fields") or []
-        suggestions = {f.get("field"): f.get("suggested") for f in fields}
-        self.assertEqual(suggestions.get("given"), "John")
-        self.assertEqual(suggestions.get("surname"), "Doe")
-
-    def test_scan_detects_similar_places(self):
-        pid = self._person("Mara", "Place", birth_place="Boston, Massachusett")
-        self._event(pid, raw_place="Boston, Massachusetts")
-        r = self.client.post("/api/dq/scan")
-        self.assertEqual(r.status_code, 200)
-        data = self.client.get("/api/dq/issues?type=place_similarity").get_json()
-        self.assertGreaterEqual(len(data["items"]), 1)
+        place_person = self._person("Mara", "Place", birth_place="Boston, Massachusett")
+        self._event(place_person, raw_place="Boston, Massachusetts")
 
-    def test_scan_detects_duplicate_families(self):
-        h = self._person("Henry", "Family")
-        w = self._person("Helen", "Family")
+        # Same couple recorded twice, and two couples whose spouse records are duplicates
+        h, w = self._people(dict(given="Henry", surname="Family"), dict(given="Helen", surname="Family"))
         self._family(husband_id=h, wife_id=w, marriage_date="1900", marriage_place="Town")
         self._family(husband_id=h, wife_id=w, marriage_date="1900", marriage_place="Town")
-        r = self.client.post("/api/dq/scan")
-        self.assertEqual(r.status_code, 200)
-        data = self.client.get("/api/dq/issues?type=duplicate_family").get_json()
-        self.assertGreaterEqual(len(data["items"]), 1)
+        couple = (dict(given="James", surname="Smith"), dict(given="Julia", surname="Smith"))
+        h1, w1 = self._people(*couple)
+        h2, w2 = self._people(*couple)
+        self._family(husband_id=h1, wife_id=w1, marriage_date="1920", marriage_place="Town")
+        self._family(husband_id=h2, wife_id=w2, marriage_date="1920", marriage_place="Town")
+
+        self._media_link(self._person("Mia", "Media"))
+        self._media_assets(("family_photo.jpg", "b" * 64, 2048), ("family photo.JPG", "c" * 64, 2050))
+
+        parent, child = self._people(
+            dict(given="Paul", surname="Parent", birth_date="2000", death_date="2001"),
+            dict(given="Chris", surname="Child", birth_date="2003"),
+        )
+        self._s.execute(relationships.insert().values(
+            parent_person_id=parent,
+            child_person_id=child,
+            rel_type="parent",
+        ))
+        self._family(marriage_date="1990")
+
+        spouse = self._person("Mona", "Married", birth_date="2000", death_date="2005")
+        self._family(husband_id=spouse, marriage_date="1995")
+        self._family(husband_id=spouse, marriage_date="2010")
+        self._s.commit()
+
+        issues_by_type = self._dq_scan_issues_by_type()
+        for issue_type in (
+            "duplicate_person",
+            "place_similarity",
+            "duplicate_family",
+            "duplicate_family_spouse_swap",
+            "duplicate_media_link",
+            "duplicate_media_asset",
+            "parent_child_age",
+            "parent_child_death",
+            "orphan_family",
+            "marriage_too_early",
+            "marriage_after_death",
+        ):
+            with self.subTest(issue_type=issue_type):
+                self.assertGreaterEqual(len(issues_by_type[issue_type]), 1)
+
+        with self.subTest(issue_type="field_standardization"):
+            target = next(
+                (i for i in issues_by_type["field_standardization"] if shouting in i["entity_ids"]),
+                None,
+            )
+            self.assertIsNotNone(target)
+            fields = target["explanation"].get("fields") or []
+            suggestions = {f.get("field"): f.get("suggested") for f in fields}
+            self.assertEqual(suggestions.get("given"), "John")
+            self.assertEqual(suggestions.get("surname"), "Doe")
 
     def test_merge_families_moves_children(self):
-        h = self._person("Gary", "Family")
-        w = self._person("Gina", "Family")
-        c = self._person("Greg", "Family")
+        h, w, c = self._people(
+            dict(given="Gary", surname="Family"),
+            dict(given="Gina", surname="Family"),
+            dict(given="Greg", surname="Family"),
+        )
         primary = self._family(husband_id=h, wife_id=w, marriage_date="1905", children=[c])
         secondary = self._family(husband_id=h, wife_id=w, marriage_date="1905")
+        self._s.commit()
 
         resp = self.client.post(
             "/api/dq/actions/mergeFamilies",
             json={"fromId": secondary, "intoId": primary, "user": "tester"},
         )
         self.assertEqual(resp.status_code, 200)
-        with self._session() as s:
-            rows = s.execute(
-                family_children.select().where(family_children.c.family_id == primary)
-            ).all()
-            self.assertTrue(any(row.child_person_id == c for row in rows))
-            self.assertIsNone(s.get(Family, secondary))
-
-    def test_scan_detects_duplicate_media_links(self):
-        pid = self._person("Mia", "Media")
-        self._media_link(pid)
-        r = self.client.post("/api/dq/scan")
-        self.assertEqual(r.status_code, 200)
-        data = self.client.get("/api/dq/issues?type=duplicate_media_link").get_json()
-        self.assertGreaterEqual(len(data["items"]), 1)
-
-    def test_scan_detects_duplicate_media_assets(self):
-        self._media_asset("family_photo.jpg", "b" * 64, size_bytes=2048)
-        self._media_asset("family photo.JPG", "c" * 64, size_bytes=2050)
-        r = self.client.post("/api/dq/scan")
-        self.assertEqual(r.status_code, 200)
-        data = self.client.get("/api/dq/issues?type=duplicate_media_asset").get_json()
-        self.assertGreaterEqual(len(data["items"]), 1)
+        rows = self.connection.execute(
+            family_children.select().where(family_children.c.family_id == primary)
+        ).all()
+        self.assertTrue(any(row.child_person_id == c for row in rows))
+        self.assertIsNone(self._read(Family.id, where=Family.id == secondary))
 
     def test_merge_media_assets(self):
         pid = self._person("Nina", "Media")
-        asset_keep = self._media_asset("scan1.jpg", "d" * 64, size_bytes=1111)
-        asset_drop = self._media_asset("scan 1.JPG", "e" * 64, size_bytes=1111)
-        with self._session() as s:
-            link = MediaLink(asset_id=asset_drop, person_id=pid)
-            s.add(link)
-            s.commit()
-            link_id = link.id
+        asset_keep, asset_drop = self._media_assets(("scan1.jpg", "d" * 64, 1111), ("scan 1.JPG", "e" * 64, 1111))
+        link_id = self._bulk_insert(MediaLink, [dict(asset_id=asset_drop, person_id=pid)])[0]
+        self._s.commit()
 
         resp = self.client.post(
             "/api/dq/actions/mergeMediaAssets",
@@ -192,71 +246,23 @@ class TestDataQuality(unittest.TestCase):
         self.assertEqual(resp.status_code, 200)
         action_id = resp.get_json()["action_id"]
 
-        with self._session() as s:
-            self.assertIsNotNone(s.get(MediaAsset, asset_keep))
-            self.assertIsNone(s.get(MediaAsset, asset_drop))
-            link = s.get(MediaLink, link_id)
-            self.assertEqual(link.asset_id, asset_keep)
+        # The link's asset must still exist, so reading it through the join covers both checks
+        self.assertEqual(
+            self._read(MediaAsset.id, where=and_(MediaLink.id == link_id, MediaAsset.id == MediaLink.asset_id)),
+            (asset_keep,),
+        )
+        self.assertIsNone(self._read(MediaAsset.id, where=MediaAsset.id == asset_drop))
 
         undo = self.client.post("/api/dq/actions/undo", json={"action_id": action_id})
         self.assertEqual(undo.status_code, 200)
-        with self._session() as s:
-            self.assertIsNotNone(s.get(MediaAsset, asset_drop))
-            link = s.get(MediaLink, link_id)
-            self.assertEqual(link.asset_id, asset_drop)
-
-    def test_scan_detects_duplicate_family_spouse_swaps(self):
-        h1 = self._person("James", "Smith")
-        w1 = self._person("Julia", "Smith")
-        h2 = self._person("James", "Smith")
-        w2 = self._person("Julia", "Smith")
-        self._family(husband_id=h1, wife_id=w1, marriage_date="1920", marriage_place="Town")
-        self._family(husband_id=h2, wife_id=w2, marriage_date="1920", marriage_place="Town")
-        r = self.client.post("/api/dq/scan")
-        self.assertEqual(r.status_code, 200)
-        data = self.client.get("/api/dq/issues?type=duplicate_family_spouse_swap").get_json()
-        self.assertGreaterEqual(len(data["items"]), 1)
-
-    def test_scan_detects_integrity_warnings(self):
-        parent = self._person("Paul", "Parent", birth_date="2000", death_date="2001")
-        child = self._person("Chris", "Child", birth_date="2003")
-        with self._session() as s:
-            s.execute(relationships.insert().values(
-                parent_person_id=parent,
-                child_person_id=child,
-                rel_type="parent",
-            ))
-            s.commit()
-        self._family(marriage_date="1990")
-
-        r = self.client.post("/api/dq/scan")
-        self.assertEqual(r.status_code, 200)
-        self.assertGreaterEqual(
-            len(self.client.get("/api/dq/issues?type=parent_child_age").get_json()["items"]), 1
-        )
-        self.assertGreaterEqual(
-            len(self.client.get("/api/dq/issues?type=parent_child_death").get_json()["items"]), 1
-        )
-        self.assertGreaterEqual(
-            len(self.client.get("/api/dq/issues?type=orphan_family").get_json()["items"]), 1
-        )
-
-    def test_scan_detects_marriage_timeline_issues(self):
-        spouse = self._person("Mona", "Married", birth_date="2000", death_date="2005")
-        self._family(husband_id=spouse, marriage_date="1995")
-        self._family(husband_id=spouse, marriage_date="2010")
-
-        r = self.client.post("/api/dq/scan")
-        self.assertEqual(r.status_code, 200)
-        self.assertGreaterEqual(
-            len(self.client.get("/api/dq/issues?type=marriage_too_early").get_json()["items"]), 1
-        )
-        self.assertGreaterEqual(
-            len(self.client.get("/api/dq/issues?type=marriage_after_death").get_json()["items"]), 1
+        self.assertEqual(
+            self._read(MediaAsset.id, where=and_(MediaLink.id == link_id, MediaAsset.id == MediaLink.asset_id)),
+            (asset_drop,),
         )
 
     def test_normalize_dates_preserves_qualifier(self):
         pid = self._person("Ava", "About", birth_date="About 1900")
+        self._s.commit()
         r = self.client.post("/api/dq/scan")
         self.assertEqual(r.status_code, 200)
         issues = self.client.get("/api/dq/issues?type=date_normalization").get_json()["items"]
@@ -286,14 +292,15 @@ class TestDataQuality(unittest.TestCase):
             },
         )
         self.assertEqual(resp.status_code, 200)
-        with self._session() as s:
-            person = s.get(Person, pid)
-            self.assertEqual(person.birth_date, "About 1900")
+        self.assertEqual(self._read(Person.birth_date, where=Person.id == pid), ("About 1900",))
 
     def test_merge_people_moves_relationships(self):
-        primary = self._person("Alice", "Merge", "1975")
-        secondary = self._person("Alicia", "Merge", "1976")
+        primary, secondary = self._people(
+            dict(given="Alice", surname="Merge", birth_date="1975"),
+            dict(given="Alicia", surname="Merge", birth_date="1976"),
+        )
         ev_id = self._event(secondary, raw_date="1 JAN 1999")
+        self._s.commit()
 
         resp = self.client.post(
             "/api/dq/actions/mergePeople",
@@ -301,14 +308,13 @@ class TestDataQuality(unittest.TestCase):
         )
         self.assertEqual(resp.status_code, 200)
 
-        with self._session() as s:
-            ev = s.get(Event, ev_id)
-            self.assertEqual(ev.person_id, primary)
-            self.assertIsNone(s.get(Person, secondary))
+        self.assertEqual(self._read(Event.person_id, where=Event.id == ev_id), (primary,))
+        self.assertIsNone(self._read(Person.id, where=Person.id == secondary))
 
     def test_normalize_places_updates_references_and_undo(self):
         pid = self._person("Bob", "Place", birth_place="boston, mass")
         ev_id = self._event(pid, raw_place="boston, mass")
+        self._s.commit()
 
         resp = self.client.post(
             "/api/dq/actions/normalizePlaces",
@@ -317,21 +323,20 @@ class TestDataQuality(unittest.TestCase):
         self.assertEqual(resp.status_code, 200)
         action_id = resp.get_json()["action_id"]
 
-        with self._session() as s:
-            ev = s.get(Event, ev_id)
-            self.assertIsNotNone(ev.place_id)
-            person = s.get(Person, pid)
-            self.assertEqual(person.birth_place, "Boston, Massachusetts")
+        place_id, birth_place = self._read(
+            Event.place_id, Person.birth_place, where=and_(Event.id == ev_id, Person.id == Event.person_id)
+        )
+        self.assertIsNotNone(place_id)
+        self.assertEqual(birth_place, "Boston, Massachusetts")
 
         undo = self.client.post("/api/dq/actions/undo", json={"action_id": action_id})
         self.assertEqual(undo.status_code, 200)
-        with self._session() as s:
-            ev = s.get(Event, ev_id)
-            self.assertIsNone(ev.place_id)
+        self.assertEqual(self._read(Event.place_id, where=Event.id == ev_id), (None,))
 
     def test_normalize_dates_and_undo(self):
         pid = self._person("Cara", "Dates")
         ev_id = self._event(pid, raw_date="3/4/1881")
+        self._s.commit()
 
         resp = self.client.post(
             "/api/dq/actions/normalizeDates",
@@ -354,23 +359,45 @@ class TestDataQuality(unittest.TestCase):
         self.assertEqual(resp.status_code, 200)
         action_id = resp.get_json()["action_id"]
 
-        with self._session() as s:
-            dn = s.query(DateNormalization).filter_by(entity_id=ev_id, entity_type="event").first()
-            self.assertIsNotNone(dn)
-            ev = s.get(Event, ev_id)
-            self.assertIsNotNone(ev.date_canonical)
-            self.assertEqual(dn.normalized, "1881-03-04")
+        event_dates = and_(
+            Event.id == ev_id,
+            DateNormalization.entity_type == "event",
+            DateNormalization.entity_id == Event.id,
+        )
+        row = self._read(DateNormalization.normalized, Event.date_canonical, where=event_dates)
+        self.assertIsNotNone(row)
+        normalized, date_canonical = row
+        self.assertIsNotNone(date_canonical)
+        self.assertEqual(normalized, "1881-03-04")
 
         undo = self.client.post("/api/dq/actions/undo", json={"action_id": action_id})
         self.assertEqual(undo.status_code, 200)
-        with self._session() as s:
-            dn = s.query(DateNormalization).filter_by(entity_id=ev_id, entity_type="event").first()
-            self.assertIsNone(dn)
-            ev = s.get(Event, ev_id)
-            self.assertIsNone(ev.date_canonical)
+        self.assertIsNone(self._read(DateNormalization.id, where=event_dates))
+        self.assertEqual(self._read(Event.date_canonical, where=Event.id == ev_id), (None,))
+
+    def test_date_normalization_lookup_uses_entity_index(self):
+        plan = self.connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT * FROM date_normalizations WHERE entity_type = ? AND entity_id = ?",
+            ("event", 1),
+        ).all()
+        detail = " ".join(row[-1] for row in plan)
+        self.assertIn("USING INDEX idx_date_norm_entity (entity_type=? AND entity_id=?)", detail)
+
+    def test_parse_date_fast_paths(self):
+        cases = {
+            "1900": ("1900", "year", None, 0.7, False),
+            "1400": (None, None, None, 0.0, True),
+            "1900-01-02": ("1900-01-02", "day", None, 0.95, False),
+            # Invalid ISO dates fall back to the general parser, which keeps the year
+            "1900-02-30": ("1900", "year", None, 0.7, False),
+        }
+        for raw, expected in cases.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(_parse_date(raw), expected)
 
     def test_standardize_fields_action_and_undo(self):
         pid = self._person("JANE", "DOE ")
+        self._s.commit()
         resp = self.client.post(
             "/api/dq/actions/standardizeFields",
             json={
@@ -387,17 +414,11 @@ class TestDataQuality(unittest.TestCase):
         self.assertEqual(resp.status_code, 200)
         action_id = resp.get_json()["action_id"]
 
-        with self._session() as s:
-            person = s.get(Person, pid)
-            self.assertEqual(person.given, "Jane")
-            self.assertEqual(person.surname, "Doe")
+        self.assertEqual(self._read(Person.given, Person.surname, where=Person.id == pid), ("Jane", "Doe"))
 
         undo = self.client.post("/api/dq/actions/undo", json={"action_id": action_id})
         self.assertEqual(undo.status_code, 200)
-        with self._session() as s:
-            person = s.get(Person, pid)
-            self.assertEqual(person.given, "JANE")
-            self.assertEqual(person.surname, "DOE ")
+        self.assertEqual(self._read(Person.given, Person.surname, where=Person.id == pid), ("JANE", "DOE "))
 
 
 if __name__ == "__main__":
@@ -1,42 +1,23 @@
+import importlib
+import logging
 import os
-import io
 import sqlite3
 import tempfile
 import unittest
 from pathlib import Path
-from PIL import Image
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
 
 from app import create_app
+from media_testcase import MediaTestCase, image_bytes
 
 
 def _write_image(path: Path, color=(10, 20, 30)):
-    img = Image.new("RGB", (32, 32), color)
-    with open(path, "wb") as fh:
-        img.save(fh, format="PNG")
-
+    path.write_bytes(image_bytes(32, 32, color))
 
-class TestMediaIngest(unittest.TestCase):
-    def setUp(self):
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = os.path.join(self.tmpdir.name, "test.sqlite")
-        self.media_dir = os.path.join(self.tmpdir.name, "media")
-        self.media_ingest = os.path.join(self.tmpdir.name, "media_ingest")
-        os.makedirs(self.media_dir, exist_ok=True)
-        os.makedirs(self.media_ingest, exist_ok=True)
-
-        self.app = create_app(
-            {
-                "TESTING": True,
-                "DATABASE": self.db_path,
-                "MEDIA_DIR": self.media_dir,
-                "MEDIA_INGEST_DIR": self.media_ingest,
-            }
-        )
-        self.client = self.app.test_client()
-
-    def tearDown(self):
-        self.tmpdir.cleanup()
 
+class TestMediaIngest(MediaTestCase):
     def test_ingest_scan_populates_unassigned(self):
         img_path = Path(self.media_ingest) / "ingest.png"
         _write_image(img_path)
@@ -70,8 +51,9 @@ class TestMediaIngest(unittest.TestCase):
         r = self.client.get("/api/media/unassigned")
         self.assertEqual(len(r.get_json()), 0)
 
-        r = self.client.get("/api/media/assets")
-        asset = next(a for a in r.get_json() if a["id"] == asset_id)
+        r = self.client.get(f"/api/media/assets/{asset_id}")
+        self.assertEqual(r.status_code, 200)
+        asset = r.get_json()
         self.assertEqual(asset["status"], "assigned")
 
 
@@ -131,6 +113,7 @@ def test_legacy_media_assets_schema_upgraded():
         with app.app_context():
             conn = sqlite3.connect(db_path)
             cols = {row[1] for row in conn.execute("PRAGMA table_info(media_assets)")}
+            unique_indexes = {row[1] for row in conn.execute("PRAGMA index_list(media_assets)") if row[2]}
             status, source_path = conn.execute(
                 "SELECT status, source_path FROM media_assets WHERE id=1"
             ).fetchone()
@@ -139,6 +122,104 @@ def test_legacy_media_assets_schema_upgraded():
         assert "status" in cols and "source_path" in cols
         assert status == "assigned"
         assert source_path is None
+        # Upload dedup uses ON CONFLICT DO NOTHING, which needs sha256 to be unique
+        assert "ix_media_assets_sha256" in unique_indexes
+
+
+
+def _legacy_db_with_duplicate_hashes(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE media_assets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            original_filename TEXT,
+            mime_type TEXT,
+            size_bytes INTEGER,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX idx_media_assets_sha256 ON media_assets(sha256)")
+    conn.execute(
+        """
+        CREATE TABLE media_links (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            asset_id INTEGER,
+            person_id INTEGER,
+            family_id INTEGER,
+            description TEXT,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO media_assets (id, path, sha256, created_at) VALUES (?, ?, ?, datetime('now'))",
+        [(1, "a.png", "hash-1"), (2, "a-copy.png", "hash-1"), (3, "b.png", "hash-2"), (4, "a-again.png", "hash-1")],
+    )
+    conn.executemany(
+        "INSERT INTO media_links (asset_id, created_at) VALUES (?, datetime('now'))",
+        [(2,), (3,), (4,)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _media_state(db_path):
+    conn = sqlite3.connect(db_path)
+    assets = conn.execute("SELECT id, sha256 FROM media_assets ORDER BY id").fetchall()
+    link_assets = sorted(row[0] for row in conn.execute("SELECT asset_id FROM media_links"))
+    unique_indexes = {row[1] for row in conn.execute("PRAGMA index_list(media_assets)") if row[2]}
+    conn.close()
+    return assets, link_assets, unique_indexes
+
+
+def test_startup_keeps_legacy_duplicate_sha256_assets(caplog):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "legacy_dupes.sqlite")
+        _legacy_db_with_duplicate_hashes(db_path)
+
+        with caplog.at_level(logging.WARNING, logger="app.db"):
+            create_app(
+                {
+                    "TESTING": True,
+                    "DATABASE": db_path,
+                    "MEDIA_DIR": os.path.join(tmpdir, "media"),
+                    "MEDIA_INGEST_DIR": os.path.join(tmpdir, "media_ingest"),
+                }
+            )
+        assets, link_assets, unique_indexes = _media_state(db_path)
+
+    # Startup never deletes rows; it skips the unique index and points at alembic
+    assert [asset_id for asset_id, _ in assets] == [1, 2, 3, 4]
+    assert link_assets == [2, 3, 4]
+    assert "ix_media_assets_sha256" not in unique_indexes
+    assert "1,2,4" in caplog.text and "alembic upgrade head" in caplog.text
+
+
+def test_sha256_unique_migration_merges_duplicates(caplog):
+    from sqlalchemy import create_engine
+
+    migration = importlib.import_module("migrations.versions.5e6f7a8b9c0d_media_assets_sha256_unique")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "legacy_dupes.sqlite")
+        _legacy_db_with_duplicate_hashes(db_path)
+
+        engine = create_engine(f"sqlite:///{db_path}")
+        with engine.begin() as conn, caplog.at_level(logging.WARNING, logger="alembic.runtime.migration"):
+            with Operations.context(MigrationContext.configure(conn)):
+                migration.upgrade()
+        engine.dispose()
+        assets, link_assets, unique_indexes = _media_state(db_path)
+
+    # Duplicates collapse into the lowest id and their links follow
+    assert assets == [(1, "hash-1"), (3, "hash-2")]
+    assert link_assets == [1, 1, 3]
+    # Upload dedup uses ON CONFLICT DO NOTHING against this index
+    assert "ix_media_assets_sha256" in unique_indexes
+    assert "sha256=hash-1 into id 1; deleting ids 2, 4" in caplog.text
 
 
 if __name__ == "__main__":
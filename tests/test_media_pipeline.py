@@ -1,51 +1,42 @@
-import os
-import tempfile
 import unittest
 from pathlib import Path
 
-from sqlalchemy.orm import sessionmaker
-
-from app import create_app
-from app.db import get_engine
 from app.media_pipeline import MediaIngestService, MediaPaths, normalize_path, match_candidates
 from app.models import MediaAsset
+from media_testcase import MediaTestCase
 
 
-class TestMediaPipeline(unittest.TestCase):
-    def setUp(self):
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = os.path.join(self.tmpdir.name, "test.sqlite")
-        self.media_dir = os.path.join(self.tmpdir.name, "media")
-        self.ingest_dir = os.path.join(self.tmpdir.name, "media_ingest")
-        os.makedirs(self.media_dir, exist_ok=True)
-        os.makedirs(self.ingest_dir, exist_ok=True)
-
-        self.app = create_app({
-            "TESTING": True,
-            "DATABASE": self.db_path,
-            "MEDIA_DIR": self.media_dir,
-            "MEDIA_INGEST_DIR": self.ingest_dir,
-        })
-        self.Session = sessionmaker(bind=get_engine())
-
-    def tearDown(self):
-        self.tmpdir.cleanup()
-
+class TestMediaPipeline(MediaTestCase):
     def test_register_asset_idempotent(self):
-        file_path = Path(self.ingest_dir) / "sample.txt"
+        file_path = Path(self.media_ingest) / "sample.txt"
         file_path.write_text("hello", encoding="utf-8")
-        paths = MediaPaths(Path(self.media_dir), Path(self.ingest_dir))
+        paths = MediaPaths(Path(self.media_dir), Path(self.media_ingest))
+
+        with self.app.app_context():
+            session = self.Session()
+            ingest = MediaIngestService(session, paths)
+            ingest.register_asset(file_path)
+            ingest.register_asset(file_path)
+            count = session.query(MediaAsset).count()
+            self.assertEqual(count, 1)
+
+    def test_register_assets_batch(self):
+        ingest_dir = Path(self.media_ingest)
+        (ingest_dir / "a.txt").write_text("same", encoding="utf-8")
+        (ingest_dir / "b.txt").write_text("same", encoding="utf-8")
+        (ingest_dir / "c.txt").write_text("other", encoding="utf-8")
+        paths = MediaPaths(Path(self.media_dir), ingest_dir)
 
         with self.app.app_context():
             session = self.Session()
-            try:
-                ingest = MediaIngestService(session, paths)
-                ingest.register_asset(file_path)
-                ingest.register_asset(file_path)
-                count = session.query(MediaAsset).count()
-                self.assertEqual(count, 1)
-            finally:
-                session.close()
+            ingest = MediaIngestService(session, paths)
+            files = [ingest_dir / "a.txt", ingest_dir / "b.txt", ingest_dir / "c.txt"]
+            results = ingest.register_assets(files)
+            self.assertEqual([created for _, created in results], [True, False, True])
+            self.assertEqual(results[0][0].id, results[1][0].id)
+            again = ingest.register_assets(files)
+            self.assertFalse(any(created for _, created in again))
+            self.assertEqual(session.query(MediaAsset).count(), 2)
 
     def test_normalize_path_windows(self):
         win_path = r"C:\Users\Me\Media\Photo.JPG"
@@ -56,19 +47,16 @@ class TestMediaPipeline(unittest.TestCase):
     def test_legacy_match_basename(self):
         file_path = Path(self.media_dir) / "photo.png"
         file_path.write_bytes(b"fake-image")
-        paths = MediaPaths(Path(self.media_dir), Path(self.ingest_dir))
+        paths = MediaPaths(Path(self.media_dir), Path(self.media_ingest))
 
         with self.app.app_context():
             session = self.Session()
-            try:
-                ingest = MediaIngestService(session, paths)
-                asset, _ = ingest.register_asset(file_path)
-                assets = [asset]
-                candidates = match_candidates(r"C:\legacy\Photo.png", None, assets, Path(self.media_dir), Path(self.ingest_dir))
-                self.assertTrue(any(c["method"] == "basename" for c in candidates))
-                self.assertGreaterEqual(max(c["confidence"] for c in candidates), 0.8)
-            finally:
-                session.close()
+            ingest = MediaIngestService(session, paths)
+            asset, _ = ingest.register_asset(file_path)
+            assets = [asset]
+            candidates = match_candidates(r"C:\legacy\Photo.png", None, assets, Path(self.media_dir), Path(self.media_ingest))
+            self.assertTrue(any(c["method"] == "basename" for c in candidates))
+            self.assertGreaterEqual(max(c["confidence"] for c in candidates), 0.8)
 
 
 if __name__ == "__main__":
@@ -1,38 +1,16 @@
+import hashlib
 import os
 import io
-import tempfile
 import unittest
-from PIL import Image
+from sqlalchemy import text
 
-from app import create_app
+from media_testcase import MediaTestCase, image_bytes
 
-class TestMediaV2(unittest.TestCase):
-    def setUp(self):
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = os.path.join(self.tmpdir.name, "test.sqlite")
-        self.media_dir = os.path.join(self.tmpdir.name, "media")
-        self.media_ingest = os.path.join(self.tmpdir.name, "media_ingest")
-        os.makedirs(self.media_dir, exist_ok=True)
-        os.makedirs(self.media_ingest, exist_ok=True)
-
-        self.app = create_app({
-            "TESTING": True,
-            "DATABASE": self.db_path,
-            "MEDIA_DIR": self.media_dir,
-            "MEDIA_INGEST_DIR": self.media_ingest,
-        })
-        self.client = self.app.test_client()
-
-    def tearDown(self):
-        self.tmpdir.cleanup()
 
+class TestMediaV2(MediaTestCase):
     def create_test_image(self, width=100, height=100, color=(255, 0, 0), format='PNG'):
         """Create a test image in memory."""
-        img = Image.new('RGB', (width, height), color)
-        img_io = io.BytesIO()
-        img.save(img_io, format)
-        img_io.seek(0)
-        return img_io
+        return io.BytesIO(image_bytes(width, height, color, format))
 
     def test_upload_image_creates_thumbnail(self):
         """Test that uploading an image creates a thumbnail."""
@@ -113,6 +91,32 @@ class TestMediaV2(unittest.TestCase):
         self.assertEqual(sha1, sha2)
         self.assertEqual(r1.get_json()["asset_id"], r2.get_json()["asset_id"])
 
+        # The hash matches the uploaded bytes, and the duplicate's temp file was removed
+        self.assertEqual(sha1, hashlib.sha256(image_bytes(100, 100, (100, 100, 100))).hexdigest())
+        self.assertEqual([n for n in os.listdir(self.media_dir) if n.endswith(".part")], [])
+
+    def test_person_upload_deduplicates_by_hash(self):
+        """Test that the per-person upload reuses the asset for identical bytes."""
+        person_ids = [
+            self.client.post("/api/people", json={"given": given, "surname": "User"}).get_json()["id"]
+            for given in ("First", "Second")
+        ]
+        shas = []
+        for person_id in person_ids:
+            r = self.client.post(
+                f"/api/people/{person_id}/media",
+                data={"file": (self.create_test_image(color=(1, 2, 3)), "same.png", "image/png")},
+                content_type="multipart/form-data"
+            )
+            self.assertEqual(r.status_code, 201)
+            shas.append(r.get_json()["sha256"])
+        self.assertEqual(shas[0], shas[1])
+
+        r = self.client.get("/api/media/assets")
+        assets = r.get_json()
+        self.assertEqual(len(assets), 1)
+        self.assertEqual(assets[0]["link_count"], 2)
+
     def test_unassigned_media_list(self):
         """Test listing unassigned media."""
         # Upload without linking
@@ -255,6 +259,41 @@ class TestMediaV2(unittest.TestCase):
             self.assertIn("sha256", asset)
             self.assertIn("link_count", asset)
 
+    def test_link_count_join_uses_asset_index(self):
+        """Test that the link_count join can seek media_links by asset_id."""
+        with self.engine.connect() as conn:
+            indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(media_links)"))}
+            self.assertIn("idx_media_links_asset", indexes)
+            plan = " ".join(
+                row[-1]
+                for row in conn.execute(
+                    text(
+                        "EXPLAIN QUERY PLAN SELECT a.id, COUNT(l.id) FROM media_assets a "
+                        "LEFT JOIN media_links l ON l.asset_id = a.id GROUP BY a.id"
+                    )
+                )
+            )
+        self.assertIn("idx_media_links_asset", plan)
+
+    def test_get_single_asset(self):
+        """Test fetching one asset by id, including the 404 case."""
+        img_data = self.create_test_image()
+        r = self.client.post(
+            "/api/media/upload",
+            data={"file": (img_data, "single.png", "image/png")},
+            content_type="multipart/form-data"
+        )
+        asset_id = r.get_json()["asset_id"]
+
+        r = self.client.get(f"/api/media/assets/{asset_id}")
+        self.assertEqual(r.status_code, 200)
+        asset = r.get_json()
+        self.assertEqual(asset["id"], asset_id)
+        self.assertEqual(asset["link_count"], 0)
+
+        r = self.client.get(f"/api/media/assets/{asset_id + 1000}")
+        self.assertEqual(r.status_code, 404)
+
     def test_thumbnail_dimensions(self):
         """Test that thumbnails have correct maximum dimensions."""
         # Create large image
@@ -269,9 +308,9 @@ class TestMediaV2(unittest.TestCase):
         result = r.get_json()
         
         # Get asset details
-        r = self.client.get("/api/media/assets")
-        assets = r.get_json()
-        asset = next(a for a in assets if a["id"] == result["asset_id"])
+        r = self.client.get(f"/api/media/assets/{result['asset_id']}")
+        self.assertEqual(r.status_code, 200)
+        asset = r.get_json()
         
         # Thumbnail should be scaled down but maintain aspect ratio
         self.assertIsNotNone(asset["thumb_width"])
@@ -81,3 +81,64 @@ def test_env_vars_for_run_script():
         os.environ.pop('APP_BIND_HOST', None)
         os.environ.pop('APP_PORT', None)
         os.environ.pop('APP_DEBUG', None)
+
+
+def test_app_config_from_env():
+    """Test AppConfig reads all settings from one env mapping and is immutable"""
+    from dataclasses import FrozenInstanceError
+    from app.config import AppConfig
+
+    config = AppConfig.from_env({
+        'APP_DB_PATH': '/tmp/termux/db.sqlite',
+        'APP_BIND_HOST': '0.0.0.0',
+        'APP_PORT': '8080',
+        'APP_DEBUG': '1',
+    })
+    assert config.db_path == '/tmp/termux/db.sqlite'
+    assert config.media_dir == '/tmp/termux/media'
+    assert config.media_ingest_dir == '/tmp/termux/media_ingest'
+    assert (config.bind_host, config.port, config.debug) == ('0.0.0.0', 8080, True)
+
+    defaults = AppConfig.from_env({})
+    assert (defaults.bind_host, defaults.port, defaults.debug) == ('127.0.0.1', 3001, False)
+    assert defaults.db_path.endswith('data/family_tree.sqlite')
+
+    with pytest.raises(FrozenInstanceError):
+        config.port = 9000
+
+
+def test_malformed_port_does_not_break_create_app():
+    """Test a malformed APP_PORT falls back to the default instead of stopping the app factory"""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Keep the app's database and media dirs out of the checkout
+        os.environ['APP_DB_PATH'] = os.path.join(tmpdir, 'db.sqlite')
+        os.environ['APP_PORT'] = 'not-a-port'
+        try:
+            from app import create_app
+            app = create_app({'TESTING': True})
+            assert app.config['APP_CONFIG'].port == 3001
+        finally:
+            os.environ.pop('APP_PORT', None)
+            os.environ.pop('APP_DB_PATH', None)
+
+
+def test_media_dirs_recreated_after_deletion():
+    """Test create_app recreates media dirs removed while the process is running"""
+    import shutil
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ['APP_DB_PATH'] = os.path.join(tmpdir, 'db.sqlite')
+        try:
+            from app import create_app
+            app = create_app({'TESTING': True})
+            shutil.rmtree(app.config['MEDIA_DIR'])
+            shutil.rmtree(app.config['MEDIA_INGEST_DIR'])
+
+            app = create_app({'TESTING': True})
+            assert os.path.isdir(app.config['MEDIA_DIR'])
+            assert os.path.isdir(app.config['MEDIA_INGEST_DIR'])
+        finally:
+            os.environ.pop('APP_DB_PATH', None)